@@ -1,9 +1,16 @@
 import os
+import random
+import time
+import timeit
+from concurrent.futures import ThreadPoolExecutor
 
 import invoke
 import livereload
 
 from diagram import GuitarChord, UkuleleChord, BassChord, GuitarFretboard
+from diagram.fingering import assign_many
+from diagram.shape import parse_chord
+from diagram.utils import convert_int
 
 server = livereload.Server()
 
@@ -36,28 +43,12 @@ def build(ctx):
     chord.save('svg/bass-E.svg')
 
     # Fretboard w/ Rocksmith-style string colors (F#)
-    fb = GuitarFretboard(
-        title='F#',
-        style={
-            'drawing': {'background_color': 'black'},
-            'fret': {'color': 'darkslategray'},
-            'nut': {'color': 'darkslategray'},
-            'marker': {'color': 'darkslategray', 'border_color': 'slategray'},
-            'string': {'color': 'darkslategray'},
-        }
-    )
+    fb = GuitarFretboard(title='F#', theme='rocksmith')
     fb.add_marker(string=(0, 5), fret=1, label='1')
     fb.add_marker(string=1, fret=3, label='3')
     fb.add_marker(string=2, fret=3, label='4')
     fb.add_marker(string=3, fret=2, label='2')
 
-    fb.strings[0].color = 'red'
-    fb.strings[1].color = 'gold'
-    fb.strings[2].color = 'deepskyblue'
-    fb.strings[3].color = 'orange'
-    fb.strings[4].color = 'limegreen'
-    fb.strings[5].color = 'magenta'
-
     fb.save('svg/F-sharp-rocksmith.svg')
 
     # Pentatonic scale shape w/ highlighted root notes
@@ -78,6 +69,103 @@ def build(ctx):
     fb.save('svg/pentatonic-shape.svg')
 
 
+@invoke.task
+def bench_parse(ctx, size=100000, repeat=3):
+    # Parse-only benchmark over a corpus of random guitar voicings, in
+    # both the compact ('xx0232') and hyphenated ('x-x-0-14-15-14') forms.
+    rng = random.Random(0)
+    corpus = []
+    for _ in range(int(size)):
+        frets = [rng.choice(['x', 0] + list(range(1, 18))) for _ in range(6)]
+        fingers = ''.join(rng.choice('-1234T') for _ in range(6))
+        if any(isinstance(f, int) and f > 9 for f in frets):
+            positions = '-'.join(str(f) for f in frets)
+        else:
+            positions = ''.join(str(f) for f in frets)
+        corpus.append((positions, fingers))
+
+    def run():
+        for positions, fingers in corpus:
+            parse_chord(positions, fingers)
+
+    def run_legacy():
+        for positions, fingers in corpus:
+            legacy_parse(positions, fingers)
+
+    for name, func in (('parse_chord', run), ('legacy', run_legacy)):
+        best = min(timeit.repeat(func, number=1, repeat=int(repeat)))
+        print('{0:>12}: parsed {1} chords in {2:.3f}s ({3:.0f} chords/s)'.format(
+            name, len(corpus), best, len(corpus) / best))
+
+
+def legacy_parse(positions, fingers):
+    # The parsing Chord did before parse_chord, kept as a baseline for
+    # bench_parse: split and convert the positions, find a barre from
+    # repeated fingers and work out the fret range.
+    if '-' in positions:
+        positions = positions.split('-')
+    positions = [convert_int(p) for p in positions]
+    fingers = list(fingers) if fingers else []
+
+    barre = None
+    for index, finger in enumerate(fingers):
+        if finger.isdigit() and fingers.count(finger) > 1:
+            barre = (positions[index], index, len(fingers) - fingers[::-1].index(finger) - 1)
+            break
+
+    fretted_positions = list(filter(lambda pos: isinstance(pos, int), positions))
+    if fretted_positions and max(fretted_positions) >= 5:
+        first_fret = min(filter(lambda pos: pos != 0, fretted_positions), default=0)
+    else:
+        first_fret = 0
+    return positions, fingers, barre, (first_fret, first_fret + 4)
+
+
+@invoke.task
+def bench_fingering(ctx, size=200000):
+    # Assign fingers to a batch of random playable-looking guitar voicings,
+    # each within a four fret window somewhere on the neck.
+    rng = random.Random(0)
+    corpus = []
+    for _ in range(int(size)):
+        base = rng.randint(1, 12)
+        corpus.append([rng.choice(['x', 0] + list(range(base, base + 4))) for _ in range(6)])
+
+    start = time.perf_counter()
+    unplayable = sum(1 for fingers in assign_many(corpus) if fingers is None)
+    elapsed = time.perf_counter() - start
+    print('fingered {0} voicings in {1:.3f}s ({2:.0f} voicings/s, {3} unplayable)'.format(
+        len(corpus), elapsed, len(corpus) / elapsed, unplayable))
+
+
+@invoke.task
+def bench_threads(ctx, workers=8, rounds=50):
+    # Render the same chord objects from many threads at once, check every
+    # result matches a serial render, and report the throughput.
+    chords = [
+        GuitarChord(positions='xx0232', fingers='---132', title='D'),
+        GuitarChord(positions='133211', fingers='134211', title='F#'),
+        GuitarChord(positions='355433', fingers='134211', barre=3, title='G'),
+        GuitarChord(positions='x-15-14-12-13-12', fingers='-43121', title='C'),
+        UkuleleChord(positions='x232', fingers='-132', title='G'),
+        BassChord(positions='x221', fingers='-321', title='E'),
+    ]
+    expected = [chord.render().getvalue() for chord in chords]
+    jobs = list(range(len(chords))) * int(rounds)
+
+    def render(index):
+        return chords[index].render().getvalue() == expected[index]
+
+    for count in (1, int(workers)):
+        with ThreadPoolExecutor(max_workers=count) as pool:
+            start = time.perf_counter()
+            results = list(pool.map(render, jobs))
+            elapsed = time.perf_counter() - start
+        assert all(results), 'threaded render differs from serial render'
+        print('{0} thread(s): {1} renders in {2:.3f}s ({3:.0f} renders/s)'.format(
+            count, len(jobs), elapsed, len(jobs) / elapsed))
+
+
 @invoke.task(pre=[clean, build])
 def serve(ctx):
     server.watch(__file__, lambda: os.system('invoke build'))
@@ -9,5 +9,8 @@ config = yaml.safe_load(pkg_resources.resource_string(__name__, 'config.yml'))
 CHORD_STYLE = config['chord']
 FRETBOARD_STYLE = config['fretboard']
 
+from .theme import register_theme, load_theme, load_builtin_themes
 from .chord import GuitarChord, BassChord, UkuleleChord, MultiFingerChord
 from .fretboard import GuitarFretboard, BassFretboard, UkuleleFretboard
+
+load_builtin_themes()
@@ -0,0 +1,134 @@
+import mmap
+import os
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locking on this platform, writers must be serialized
+    # by the caller.
+    fcntl = None
+
+MAGIC = b'FBCACHE1'
+
+# Each record is a sha256 digest, the payload length, then the payload.
+RECORD_HEADER = struct.Struct('<32sI')
+
+
+class MmapCache(object):
+    """
+    Cache of rendered diagrams shared by every process on a host.
+
+    SVG bytes are appended to a single file which each process memory-maps,
+    so the cached working set lives once in the page cache no matter how
+    many workers read it. Keys are 32-byte digests such as
+    `Chord.cache_key()`. Records are never rewritten, so readers only need to
+    scan what other processes have appended since they last looked.
+
+    path = file backing the cache, created if missing.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index = {}
+        self._end = len(MAGIC)
+        self._map = None
+
+        self._fd = None
+        # flock() doesn't exclude threads sharing the same open file.
+        self._mutex = threading.Lock()
+        self._lock(exclusive=True)
+        try:
+            if os.fstat(self._fd).st_size == 0:
+                os.write(self._fd, MAGIC)
+            elif os.read(self._fd, len(MAGIC)) != MAGIC:
+                raise ValueError('%s is not a diagram cache file' % path)
+        finally:
+            self._unlock()
+
+    def _lock(self, exclusive=False):
+        self._mutex.acquire()
+        # flock() locks belong to the open file, which a forked worker
+        # shares with its parent, so each process opens its own.
+        if self._fd is None or self._pid != os.getpid():
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+    def _unlock(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._mutex.release()
+
+    def _refresh(self):
+        """
+        Index any records appended since the last refresh. Must be called
+        with the file locked, so no record is seen half-written.
+        """
+        size = os.fstat(self._fd).st_size
+        if size <= self._end:
+            return
+
+        # Views handed out by get() keep the previous map alive until
+        # they're released, so don't close it here.
+        self._map = mmap.mmap(self._fd, size, access=mmap.ACCESS_READ)
+
+        offset = self._end
+        while offset + RECORD_HEADER.size <= size:
+            key, length = RECORD_HEADER.unpack_from(self._map, offset)
+            start = offset + RECORD_HEADER.size
+            if start + length > size:
+                # Truncated by a writer that died mid-append.
+                break
+            self.index[key] = (start, length)
+            offset = start + length
+        self._end = offset
+
+    def get(self, key):
+        """
+        Return a read-only memoryview of the cached bytes, or None.
+        """
+        if key not in self.index:
+            self._lock()
+            try:
+                self._refresh()
+            finally:
+                self._unlock()
+            if key not in self.index:
+                return None
+
+        offset, length = self.index[key]
+        return memoryview(self._map)[offset:offset + length]
+
+    def put(self, key, data):
+        self._lock(exclusive=True)
+        try:
+            self._refresh()
+            if key in self.index:
+                return
+            os.lseek(self._fd, self._end, os.SEEK_SET)
+            record = memoryview(RECORD_HEADER.pack(key, len(data)) + bytes(data))
+            while record:
+                record = record[os.write(self._fd, record):]
+            self._refresh()
+        finally:
+            self._unlock()
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        self._lock()
+        try:
+            self._refresh()
+        finally:
+            self._unlock()
+        return len(self.index)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._map = None
@@ -1,7 +1,18 @@
+import hashlib
+import io
+import json
+
 from attrdict import AttrDict
 import diagram
 from .compat import StringIO
-from .utils import convert_int
+from .fingering import assign_fingers
+from .naming import identify_shape
+from .shape import parse_chord
+from .theme import freeze, get_theme
+
+# Bump whenever a change to drawing changes the SVG of existing chords, so
+# renders cached by an older version are no longer found under their keys.
+RENDER_VERSION = 2
 
 
 class Chord(object):
@@ -20,10 +31,25 @@ class Chord(object):
     barre = int specifying a fret to be completely barred. Minimal barres are
     automatically inserted, so this should be used when you want to override
     this behaviour.
+
+    auto_fingers = when True and no fingers are given, work them out from
+    the positions, see `diagram.fingering`.
+
+    auto_title = when True and no title is given, use the chord's name as
+    identified from its positions and the instrument tuning, e.g. 'D/F#'.
+
+    theme = name of a registered theme (see `diagram.register_theme`), applied
+    before `style`.
+
+    cache = optional store for rendered SVG bytes, e.g. a
+    `diagram.cache.MmapCache`, consulted by render(). Set it on the class to
+    share it between all chords.
     """
-    default_style = AttrDict(diagram.FRETBOARD_STYLE) + AttrDict(diagram.CHORD_STYLE)
+    # Read-only, as it's shared by every chord
+    default_style = freeze(AttrDict(diagram.FRETBOARD_STYLE) + AttrDict(diagram.CHORD_STYLE))
     inlays = None
     strings = None
+    cache = None
 
     def __init__(
             self,
@@ -31,121 +57,171 @@ class Chord(object):
             fingers=None,
             barre=None,
             title=None,
-            style=None
+            style=None,
+            theme=None,
+            auto_title=False,
+            auto_fingers=False
     ):
 
-        if positions is None:
-            positions = []
-        elif isinstance(positions, str):
-            if '-' in positions:
-                # use - to separate numbers when frets go above 9, e.g., x-x-0-10-10-10
-                positions = positions.split('-')
-            else:
-                positions = list(positions)
-        # oops,. did we put in something like 5333 without quoting?
-        if isinstance(positions, int):
-            positions = list(str(positions))
-
-        try:
-            self.positions = [ convert_int(p) for p in positions ]
-        except:
-            print(positions)
-
-        try:
-            self.fingers = list(fingers) if fingers else []
-        except TypeError:
-            self.fingers = list(str(fingers))
+        self.shape = parse_chord(positions, fingers)
+        if fingers is None and auto_fingers:
+            self.shape = parse_chord(positions, assign_fingers(self.shape))
 
         self.barre = barre
 
-        self.style = self.default_style + AttrDict(style or {})
+        if theme is not None:
+            self.style = AttrDict(get_theme(theme).chord) + AttrDict(style or {})
+        else:
+            self.style = AttrDict(self.default_style) + AttrDict(style or {})
 
         self.title = title
-
-        self.fretboard = None
+        if title is None and auto_title:
+            name = self.identify()
+            if name is not None:
+                self.title = str(name)
 
     @property
     def fretboard_cls(self):
         raise NotImplementedError
 
+    @property
+    def positions(self):
+        """
+        Fret positions as a tuple, with None for muted strings.
+        """
+        return self.shape.positions
+
+    @positions.setter
+    def positions(self, positions):
+        self.shape = parse_chord(positions, self.shape.fingers)
+
+    @property
+    def fingers(self):
+        return list(self.shape.fingers)
+
+    @fingers.setter
+    def fingers(self, fingers):
+        self.shape = parse_chord(self.positions, fingers)
+
     def get_fret_range(self):
-        fretted_positions = list(filter(lambda pos: isinstance(pos, int), self.positions))
-        if max(fretted_positions) < 5:
-            first_fret = 0
-        else:
-            first_fret = min(filter(lambda pos: pos != 0, fretted_positions))
-        return (first_fret, first_fret + 4)
+        return self.shape.get_fret_range()
+
+    def identify(self):
+        """
+        Name this chord from its positions, see `diagram.naming`. Returns a
+        ChordName (str() it for e.g. 'Am7/G') or None.
+        """
+        return identify_shape(self.shape, self.fretboard_cls.tuning)
+
+    def spec(self):
+        """
+        Everything that affects the rendered output, as plain JSON types.
+        """
+        return {
+            'version': '%s/%d' % (diagram.__version__, RENDER_VERSION),
+            'type': type(self).__name__,
+            'positions': self.positions,
+            'fingers': self.fingers,
+            # only the override, an inferred barre follows from the fingers
+            'barre': self.barre,
+            'title': self.title,
+            'style': self.style,
+        }
+
+    def cache_key(self):
+        """
+        sha256 digest of the canonical spec, identical for equal chords.
+        """
+        # themed styles hold read-only mappings, serialize them as dicts
+        canonical = json.dumps(self.spec(), sort_keys=True, separators=(',', ':'), default=dict)
+        return hashlib.sha256(canonical.encode('utf-8')).digest()
 
-    def draw(self):
-        self.fretboard = self.fretboard_cls(
+    def draw(self, frets=None):
+        """
+        Return a new fretboard with this chord's markers and labels. The
+        chord itself is left untouched, so it can be drawn from several
+        threads at once.
+
+        frets = (first, last) fret range to show instead of the chord's own.
+        """
+        fretboard = self.fretboard_cls(
             strings=self.strings,
-            frets=self.get_fret_range(),
+            frets=frets or self.get_fret_range(),
             inlays=self.inlays,
             title=self.title,
             style=self.style
         )
 
-        if self.barre is not None:
+        shape = self.shape
+        barre = self.barre
+
+        if barre is not None:
             # when barre is overridden, barre all strings.
-            self.fretboard.add_barre(
-                fret=self.barre,
-                strings=(0, self.fretboard.string_count - 1),
-                finger=self.fingers[self.positions.index(self.barre)],
+            fretboard.add_barre(
+                fret=barre,
+                strings=(0, fretboard.string_count - 1),
+                finger=shape.finger(shape.frets.index(barre)),
+            )
+        elif shape.barre is not None:
+            # Otherwise use the barred fret found while parsing
+            barre = shape.barre.fret
+            fretboard.add_barre(
+                fret=barre,
+                strings=(shape.barre.first_string, shape.barre.last_string),
+                finger=shape.barre.finger,
             )
-        else:
-            # Otherwise check for a barred fret
-            for index, finger in enumerate(self.fingers):
-                if (isinstance(finger, int) or finger.isdigit()) and self.fingers.count(finger) > 1:
-                    self.barre = self.positions[index]
-                    self.fretboard.add_barre(
-                        fret=self.barre,
-                        strings=(index, len(self.fingers) - self.fingers[::-1].index(finger) - 1),
-                        finger=finger,
-                    )
-                    break
-
-        for string in range(self.fretboard.string_count):
-            # Get the position and fingering
-            try:
-                fret = self.positions[string]
-            except IndexError:
-                pos = None
 
-            # Determine if the string is muted or open
-            is_muted = False
-            is_open = False
+        for string in range(fretboard.string_count):
+            # Get the position, None for muted strings
+            fret = shape.fret(string)
 
-            if fret == 0:
-                is_open = True
-            elif fret is None:
-                is_muted = True
+            # Determine if the string is muted or open
+            is_muted = fret is None
+            is_open = fret == 0
 
             if is_muted or is_open:
-                self.fretboard.add_string_label(
+                fretboard.add_string_label(
                     string=string,
                     label='X' if is_muted else 'O',
                     font_color=self.style.string.muted_font_color if is_muted else self.style.string.open_font_color
                 )
-            elif fret is not None and fret != self.barre:
+            elif fret != barre:
                 # Add the fret marker
-                try:
-                    finger = self.fingers[string]
-                except IndexError:
-                    finger = None
-
-                self.fretboard.add_marker(
+                fretboard.add_marker(
                     string=string,
                     fret=fret,
-                    label=finger,
+                    label=shape.finger(string),
                 )
 
-    def render(self, output=None):
-        self.draw()
+        return fretboard
 
+    def render(self, output=None):
+        """
+        Write the SVG to `output`, a text or binary file object (a new
+        StringIO by default), and return it. Cached renders are written to
+        binary outputs straight from the cache, without a copy.
+        """
         if output is None:
             output = StringIO()
+        binary = isinstance(output, (io.RawIOBase, io.BufferedIOBase))
+
+        if self.cache is None:
+            if binary:
+                output.write(self.draw().render().getvalue().encode('utf-8'))
+            else:
+                self.draw().render(output)
+            return output
 
-        self.fretboard.render(output)
+        key = self.cache_key()
+        svg = self.cache.get(key)
+        if svg is None:
+            svg = self.draw().render().getvalue().encode('utf-8')
+            self.cache.put(key, svg)
+
+        if binary:
+            output.write(svg)
+        else:
+            output.write(bytes(svg).decode('utf-8'))
         return output
 
     def save(self, filename):
@@ -186,6 +262,9 @@ class MultiFingerChord(UkuleleChord):
             'barre': kwargs.get('barre', None),
             'title': kwargs.get('title', None),
             'style': kwargs.get('style', None),
+            'theme': kwargs.get('theme', None),
+            'auto_title': kwargs.get('auto_title', False),
+            'auto_fingers': kwargs.get('auto_fingers', False),
             }
 
         super().__init__(**superargs)
@@ -242,16 +321,22 @@ class MultiFingerChord(UkuleleChord):
         print("{0} fret range: {1}-{2}".format(self.title, *fr))
         return fr
 
+    def spec(self):
+        spec = super(MultiFingerChord, self).spec()
+        spec['extras'] = self.extras
+        spec['fret_range'] = self.fretspec
+        return spec
 
-    def draw(self):
-        super(MultiFingerChord, self).draw()
+    def draw(self, frets=None):
+        fretboard = super(MultiFingerChord, self).draw(frets)
         if self.extras is not None:
             for e in self.extras:
-                self.fretboard.add_marker(
+                fretboard.add_marker(
                         string=int(e['string']),
                         fret=int(e['fret']),
                         color=e.get('color'),
                         label=e['finger'],
                         font_color=e.get('font_color')
                         )
+        return fretboard
 
@@ -0,0 +1,159 @@
+"""
+Work out fingers for a chord from its positions.
+
+Fretted notes are taken in order of fret then string, and each one either
+gets the next free finger or joins the previous finger as a barre. A
+memoized search over those choices finds the fingering with the lowest
+cost. The cost model favours one finger per fret from the lowest fretted
+position, and penalises stretches, barres and using the thumb.
+
+Results are cached by shape, relative to the lowest fret, so a voicing and
+its transpositions up the neck are solved once.
+"""
+from functools import lru_cache
+
+from .shape import MUTED, parse_chord
+
+FINGERS = 4
+
+# Widest fret span a hand can cover, from the lowest to the highest fret.
+MAX_SPAN = 4
+
+# Cost model weights
+FINGER_COST = 0.3         # every finger put down
+PLACEMENT_COST = 1.0      # per fret above one-finger-per-fret
+CROWDING_COST = 0.2       # per fret below it, fingers bunch up easily
+STRETCH_COST = 2.0        # per fret of stretch between neighbouring fingers
+BARRE_COST = 1.2          # laying a finger flat across strings
+BARRE_STRING_COST = 0.05  # per string spanned by the barre
+MINI_BARRE_COST = 1.5     # barring with a finger other than the index
+THUMB_COST = 1.5          # wrapping the thumb over the neck for the low string
+
+
+def can_barre(frets, fret, first_string, last_string):
+    """
+    A finger can lie across strings first..last at `fret` if every string
+    in between is fretted at or above it.
+    """
+    for string in range(first_string + 1, last_string):
+        if frets[string] == MUTED or frets[string] < fret:
+            return False
+    return True
+
+
+def solve(frets):
+    """
+    Return (cost, fingers) for the lowest-cost fingering of `frets` (as in
+    ChordShape.frets), or None when it can't be played.
+    """
+    notes = sorted((fret, string) for string, fret in enumerate(frets)
+                   if fret != MUTED and fret != 0)
+    if not notes:
+        return 0, ('-',) * len(frets)
+    base = notes[0][0]
+    if notes[-1][0] - base > MAX_SPAN:
+        return None
+
+    cache = {}
+
+    def search(index, finger, barre_start, barred):
+        """
+        Best (cost, choices) for notes[index:], with `finger` the last
+        finger put down, starting on string `barre_start`.
+        """
+        if index == len(notes):
+            return 0, ()
+        key = (index, finger, barre_start, barred)
+        if key in cache:
+            return cache[key]
+
+        fret, string = notes[index]
+        best = None
+
+        # Lay the previous finger across to this string as well
+        if finger and notes[index - 1][0] == fret and can_barre(frets, fret, barre_start, string):
+            cost = BARRE_STRING_COST * (string - notes[index - 1][1])
+            if not barred:
+                cost += BARRE_COST + (MINI_BARRE_COST if finger > 1 else 0)
+            rest = search(index + 1, finger, barre_start, True)
+            if rest is not None:
+                best = (cost + rest[0], (finger,) + rest[1])
+
+        # Or put down a new finger
+        previous_fret = notes[index - 1][0] if finger else base
+        for new_finger in range(finger + 1, FINGERS + 1):
+            offset = (fret - base) - (new_finger - 1)
+            cost = FINGER_COST + (PLACEMENT_COST * offset if offset > 0
+                                  else CROWDING_COST * -offset)
+            if finger:
+                # a finger can reach one fret further than its neighbour
+                stretch = (fret - previous_fret) - (new_finger - finger) - 1
+                if stretch > 0:
+                    cost += STRETCH_COST * stretch
+            rest = search(index + 1, new_finger, string, False)
+            if rest is not None and (best is None or cost + rest[0] < best[0]):
+                best = (cost + rest[0], (new_finger,) + rest[1])
+
+        cache[key] = best
+        return best
+
+    def assemble(result, extra=()):
+        fingers = ['-'] * len(frets)
+        for (fret, string), finger in zip(notes, result[1]):
+            fingers[string] = str(finger)
+        for string, label in extra:
+            fingers[string] = label
+        return result[0], tuple(fingers)
+
+    best = None
+    result = search(0, 0, 0, False)
+    if result is not None:
+        best = assemble(result)
+
+    # Try the thumb on the lowest string, when it's level with or a fret
+    # behind the rest of the shape
+    rest = [fret for fret in frets[1:] if fret != MUTED and fret != 0]
+    if frets[0] != MUTED and frets[0] and rest and 0 <= min(rest) - frets[0] <= 1:
+        thumbless = solve(bytes((MUTED,)) + bytes(frets[1:]))
+        if thumbless is not None and (best is None or thumbless[0] + THUMB_COST < best[0]):
+            best = (thumbless[0] + THUMB_COST, ('T',) + thumbless[1][1:])
+
+    return best
+
+
+def normalize(frets):
+    """
+    Shift fretted positions so the lowest one is fret 1, keeping open and
+    muted strings, so that transposed shapes share a cache entry.
+    """
+    fretted = [fret for fret in frets if fret != MUTED and fret != 0]
+    if not fretted:
+        return bytes(frets), 0
+    offset = min(fretted) - 1
+    return bytes(fret - offset if fret != MUTED and fret != 0 else fret
+                 for fret in frets), offset
+
+
+@lru_cache(maxsize=65536)
+def _solve_normalized(frets):
+    result = solve(frets)
+    return None if result is None else ''.join(result[1])
+
+
+def assign_fingers(positions):
+    """
+    Return a fingers string such as '-32-1-' for positions in any form
+    Chord accepts, or None if no fingering fits in one hand.
+    Repeated finger numbers form a barre, as in Chord.
+    """
+    shape = positions if hasattr(positions, 'frets') else parse_chord(positions)
+    frets, _ = normalize(shape.frets)
+    return _solve_normalized(frets)
+
+
+def assign_many(positions):
+    """
+    Yield assign_fingers() for each of an iterable of positions.
+    """
+    for item in positions:
+        yield assign_fingers(item)
@@ -5,6 +5,7 @@ import svgwrite
 import diagram
 
 from .compat import StringIO
+from .theme import freeze, get_theme
 from .utils import dict_merge
 
 # fretboard = Fretboard(strings=6, frets=(3, 8))
@@ -14,7 +15,9 @@ from .utils import dict_merge
 
 
 class Fretboard(object):
-    default_style = AttrDict(diagram.FRETBOARD_STYLE)
+    # Read-only, as it's shared by every fretboard
+    default_style = freeze(diagram.FRETBOARD_STYLE)
+    tuning = None
 
     def __init__(
             self,
@@ -23,15 +26,24 @@ class Fretboard(object):
             inlays=None,
             title=None,
             style=None,
-            label_all_frets=False
+            label_all_frets=False,
+            theme=None
     ):
+        if theme is not None:
+            self.style = AttrDict(get_theme(theme).fretboard) + AttrDict(style or {})
+        else:
+            self.style = AttrDict(self.default_style) + AttrDict(style or {})
+
+        # per-string colors, e.g. from a theme
+        colors = self.style.string.colors or ()
+
         self.frets = list(range(frets[0] - 1, frets[1] + 1))
         self.strings = [AttrDict({
-            'color': None,
+            'color': colors[index] if index < len(colors) else None,
             'label': None,
             'font_color': None,
             'font_size': None,
-        }) for _ in range(strings or self.string_count)]
+        }) for index in range(strings or self.string_count)]
 
         self.markers = []
 
@@ -39,18 +51,8 @@ class Fretboard(object):
         # A double inlay will be added at the 12th/24th/... fret regardless.
         self.inlays = inlays or self.inlays
 
-        self.layout = AttrDict()
-
-
-        self.style = self.default_style + AttrDict(style or {})
-
         self.title = title
 
-        # strings get thinner from low -> high
-        # not everyone wants this, so make it configurable
-
-        self.drawing = None
-
     def add_string_label(self, string, label, font_color=None):
         self.strings[string].label = label
         self.strings[string].font_color = font_color
@@ -73,91 +75,97 @@ class Fretboard(object):
         )
 
     def calculate_layout(self):
+        layout = AttrDict()
+
         # Bounding box of our fretboard
-        self.layout.x = self.style.drawing.spacing
+        layout.x = self.style.drawing.spacing
         # Above the fret box is the title, with padding either side
-        self.layout.y = 0
+        layout.y = 0
         if self.title:
-            self.layout.y += (self.style.drawing.spacing
-                              + self.style.title.font_size)
+            layout.y += (self.style.drawing.spacing
+                         + self.style.title.font_size)
 
         # Add some extra space on the right for fret indicators
-        self.layout.width = (self.style.drawing.width
-                             - self.layout.x
-                             - self.style.drawing.spacing)
+        layout.width = (self.style.drawing.width
+                        - layout.x
+                        - self.style.drawing.spacing)
 #        if self.frets[0] > 0:
 # allow for fret labels on ALL diagrams for consistent width
-        self.layout.width -= self.style.fret_label.width
+        layout.width -= self.style.fret_label.width
 
-        self.layout.height = (self.style.drawing.height
-                              - (self.layout.y))
+        layout.height = (self.style.drawing.height
+                         - (layout.y))
 
         # Spacing between the strings
-        self.layout.string_space = self.layout.width / (len(self.strings) - 1)
+        layout.string_space = layout.width / (len(self.strings) - 1)
 
         # Spacing between the frets, with room at the top and bottom for the
         # nut
-        self.layout.fret_space = (
-                (self.layout.height - self.style.nut.size * 2)
+        layout.fret_space = (
+                (layout.height - self.style.nut.size * 2)
                 / (len(self.frets) - 1)
         )
 
-    def draw_frets(self):
-        top = self.layout.y + self.style.nut.size
+        return layout
+
+    def draw_frets(self, drawing, layout):
+        top = layout.y + self.style.nut.size
 
         for index, fret in enumerate(self.frets):
             if fret < 0:
                 # The first fret is the nut, don't draw it.
                 continue
             else:
-                self.drawing.add(
-                    self.drawing.line(
+                drawing.add(
+                    drawing.line(
                         start=(
-                            self.layout.x,
-                            top + (self.layout.fret_space * index)
+                            layout.x,
+                            top + (layout.fret_space * index)
                         ),
                         end=(
-                            self.layout.x + self.layout.width,
-                            top + (self.layout.fret_space * index)
+                            layout.x + layout.width,
+                            top + (layout.fret_space * index)
                         ),
                         stroke=self.style.fret.color,
                         stroke_width=self.style.fret.size,
                     )
                 )
 
-    def draw_strings(self):
-        top = self.layout.y
-        bottom = top + self.layout.height
+    def string_position(self, layout, index):
+        """
+        Return the x coordinate and stroke width of string `index`.
+        """
+        # adds a style option so all strings have the same width
+        if self.style.string.equal_weight:
+            width = self.style.string.size
+        else:
+            # previous default, strings get thinner from left to right
+            # just like real ones.
+            width = (self.style.string.size
+                     - ((self.style.string.size / (len(self.strings) * 1.5))
+                        * index))
+
+        # Offset the first and last strings, so they're not drawn
+        # outside the edge of the nut.
+        offset = 0
+        if index == 0:
+            offset = width / 2.
+        elif index == len(self.strings) - 1:
+            offset = - width / 2.
+
+        return layout.x + (layout.string_space * index) + offset, width
+
+    def draw_strings(self, drawing, layout):
+        top = layout.y
+        bottom = top + layout.height
         if self.frets[0] == -1:
-            top += self.layout.fret_space
-
-        label_y = (self.layout.y
-                   + self.style.drawing.font_size / 2
-                   - self.style.drawing.spacing)
+            top += layout.fret_space
 
         for index, string in enumerate(self.strings):
-            # adds a style option so all strings have the same width
-            if self.style.string.equal_weight:
-                width = self.style.string.size
-            else:
-                # previous default, strings get thinner from left to right
-                # just like real ones.
-                width = (self.style.string.size
-                         - ((self.style.string.size / (len(self.strings) * 1.5))
-                            * index))
-
-            # Offset the first and last strings, so they're not drawn
-            # outside the edge of the nut.
-            offset = 0
-            if index == 0:
-                offset = width / 2.
-            elif index == len(self.strings) - 1:
-                offset = - width / 2.
-
-            x = self.layout.x + (self.layout.string_space * index) + offset
+            x, width = self.string_position(layout, index)
 
-            self.drawing.add(
-                self.drawing.line(
+            drawing.add(
+                drawing.line(
                     start=(x, top),
                     end=(x, bottom),
                     stroke=string.color or self.style.string.color,
@@ -165,10 +173,17 @@ class Fretboard(object):
                 )
             )
 
+    def draw_string_labels(self, drawing, layout):
+        label_y = (layout.y
+                   + self.style.drawing.font_size / 2
+                   - self.style.drawing.spacing)
+
+        for index, string in enumerate(self.strings):
             # Draw the label above the string
             if string.label is not None:
-                self.drawing.add(
-                    self.drawing.text(
+                x, _ = self.string_position(layout, index)
+                drawing.add(
+                    drawing.text(
                         string.label,
                         insert=(x, label_y),
                         font_family=self.style.string.label_font_family or
@@ -182,19 +197,19 @@ class Fretboard(object):
                     )
                 )
 
-    def draw_nut(self):
+    def draw_nut(self, drawing, layout):
         if self.frets[0] == -1:
-            top = self.layout.y + self.layout.fret_space + (self.style.nut.size / 2)
-            self.drawing.add(
-                self.drawing.line(
-                    start=(self.layout.x, top),
-                    end=(self.layout.x + self.layout.width, top),
+            top = layout.y + layout.fret_space + (self.style.nut.size / 2)
+            drawing.add(
+                drawing.line(
+                    start=(layout.x, top),
+                    end=(layout.x + layout.width, top),
                     stroke=self.style.nut.color,
                     stroke_width=self.style.nut.size,
                 )
             )
 
-    def draw_inlays(self):
+    def draw_inlays(self, drawing, layout):
         x = self.style.drawing.spacing - (self.style.inlays.radius * 4)
 
         for index, fret in enumerate(self.frets):
@@ -202,15 +217,15 @@ class Fretboard(object):
                 continue
 
             y = sum((
-                self.layout.y,
+                layout.y,
                 self.style.nut.size,
-                self.layout.fret_space * index,
-            )) - self.layout.fret_space / 2
+                layout.fret_space * index,
+            )) - layout.fret_space / 2
 
             if fret % 12 in self.inlays:
                 # Single dot inlay
-                self.drawing.add(
-                    self.drawing.circle(
+                drawing.add(
+                    drawing.circle(
                         center=(x, y),
                         r=self.style.inlays.radius,
                         fill=self.style.inlays.color,
@@ -218,22 +233,22 @@ class Fretboard(object):
                 )
             elif fret > 0 and not fret % 12:
                 # Double dot inlay
-                self.drawing.add(
-                    self.drawing.circle(
+                drawing.add(
+                    drawing.circle(
                         center=(x, y - (self.style.inlays.radius * 2)),
                         r=self.style.inlays.radius,
                         fill=self.style.inlays.color,
                     )
                 )
-                self.drawing.add(
-                    self.drawing.circle(
+                drawing.add(
+                    drawing.circle(
                         center=(x, y + (self.style.inlays.radius * 2)),
                         r=self.style.inlays.radius,
                         fill=self.style.inlays.color,
                     )
                 )
 
-    def draw_fret_label(self):
+    def draw_fret_label(self, drawing, layout):
         """
         draw fret number to the right of the first used fret.
         """
@@ -246,8 +261,8 @@ class Fretboard(object):
         fretlist = []
         # x coordinate
         label_x = sum((
-            self.layout.x,                   # left of fretboard
-            self.layout.width,               # width of fretboard
+            layout.x,                   # left of fretboard
+            layout.width,               # width of fretboard
             self.style.marker.radius,        # radius of marker or barre
             self.style.marker.stroke_width,  #
             self.style.fret_label.width / 2, # half label width (center-aligned)
@@ -256,10 +271,10 @@ class Fretboard(object):
         for i, f in enumerate(self.frets[1:]):
             # this is the part that will be different for each fret
             y = sum((
-                self.layout.y,                   # top of fretboard
+                layout.y,                   # top of fretboard
                 self.style.nut.size,             # nut size/weight (configurable)
-                self.layout.fret_space / 2,      # middle of fret (vertically)
-                self.layout.fret_space * i       # move down 'i' frets
+                layout.fret_space / 2,      # middle of fret (vertically)
+                layout.fret_space * i       # move down 'i' frets
             ))
 
             fretlist.append((label_x, y, str(f)))
@@ -270,8 +285,8 @@ class Fretboard(object):
             fretlist = [ fretlist[0] ]
         for x, y, label_text in fretlist:
             # add a new text element at the above coordinates
-            self.drawing.add(
-                self.drawing.text(
+            drawing.add(
+                drawing.text(
                     label_text,
                     insert=(x, y),
                     font_family=self.style.drawing.font_family,
@@ -286,26 +301,26 @@ class Fretboard(object):
                 )
             )
 
-    def draw_markers(self):
+    def draw_markers(self, drawing, layout):
         for marker in self.markers:
             if isinstance(marker.string, (list, tuple)):
-                self.draw_barre(marker)
+                self.draw_barre(drawing, layout, marker)
             else:
-                self.draw_marker(marker)
+                self.draw_marker(drawing, layout, marker)
 
-    def draw_marker(self, marker):
+    def draw_marker(self, drawing, layout, marker):
         # Fretted position, add the marker to the fretboard.
         x = (self.style.drawing.spacing
-             + (self.layout.string_space * marker.string))
+             + (layout.string_space * marker.string))
         y = sum((
-            self.layout.y,
+            layout.y,
             self.style.nut.size,
-            (self.layout.fret_space * (marker.fret - self.frets[0])
-             - self.layout.fret_space / 2)
+            (layout.fret_space * (marker.fret - self.frets[0])
+             - layout.fret_space / 2)
         ))
 
-        self.drawing.add(
-            self.drawing.circle(
+        drawing.add(
+            drawing.circle(
                 center=(x, y),
                 r=self.style.marker.radius,
                 fill=marker.color or self.style.marker.color,
@@ -316,8 +331,8 @@ class Fretboard(object):
 
         # Draw the label
         if marker.label is not None:
-            self.drawing.add(
-                self.drawing.text(
+            drawing.add(
+                drawing.text(
                     marker.label,
                     insert=(x, y),
                     font_family=self.style.drawing.font_family,
@@ -330,23 +345,23 @@ class Fretboard(object):
                 )
             )
 
-    def draw_barre(self, marker):
+    def draw_barre(self, drawing, layout, marker):
         start_x = (self.style.drawing.spacing
-                   + self.layout.string_space * marker.string[0])
+                   + layout.string_space * marker.string[0])
         end_x = (self.style.drawing.spacing
-                 + self.layout.string_space * marker.string[1])
+                 + layout.string_space * marker.string[1])
 
         y = sum((
-            self.layout.y,
+            layout.y,
             self.style.nut.size,
-            (self.layout.fret_space * (marker.fret - self.frets[0])
-             - self.layout.fret_space / 2)
+            (layout.fret_space * (marker.fret - self.frets[0])
+             - layout.fret_space / 2)
         ))
 
         # Lines don't support borders, so fake it by drawing
         # a slightly larger line behind it.
-        self.drawing.add(
-            self.drawing.line(
+        drawing.add(
+            drawing.line(
                 start=(start_x, y),
                 end=(end_x, y),
                 stroke=self.style.marker.border_color,
@@ -356,8 +371,8 @@ class Fretboard(object):
             )
         )
 
-        self.drawing.add(
-            self.drawing.line(
+        drawing.add(
+            drawing.line(
                 start=(start_x, y),
                 end=(end_x, y),
                 stroke=self.style.marker.color,
@@ -367,8 +382,8 @@ class Fretboard(object):
         )
 
         if marker.label is not None:
-            self.drawing.add(
-                self.drawing.text(
+            drawing.add(
+                drawing.text(
                     marker.label,
                     insert=(start_x, y),
                     font_family=self.style.drawing.font_family,
@@ -381,12 +396,12 @@ class Fretboard(object):
                 )
             )
 
-    def draw_title(self):
+    def draw_title(self, drawing, layout):
         if self.title is not None:
-            x = self.layout.width/2 + self.style.drawing.spacing
+            x = layout.width/2 + self.style.drawing.spacing
             y = self.style.drawing.spacing
-            self.drawing.add(
-                self.drawing.text(
+            drawing.add(
+                drawing.text(
                     self.title,
                     insert=(x, y),
                     font_family=self.style.title.font_family,
@@ -399,16 +414,19 @@ class Fretboard(object):
                 )
             )
 
-    def draw(self):
-        self.drawing = svgwrite.Drawing(size=(
+    def new_drawing(self):
+        """
+        Return an empty svgwrite Drawing sized and filled for this fretboard.
+        """
+        drawing = svgwrite.Drawing(size=(
             self.style.drawing.width,
             self.style.drawing.height
         ))
-        self.drawing['class'] = 'fretboard'
+        drawing['class'] = 'fretboard'
 
         if self.style.drawing.background_color is not None:
-            self.drawing.add(
-                self.drawing.rect(
+            drawing.add(
+                drawing.rect(
                     insert=(0, 0),
                     size=(
                         self.style.drawing.width,
@@ -418,22 +436,34 @@ class Fretboard(object):
                 )
             )
 
-        self.calculate_layout()
-        self.draw_frets()
-        self.draw_inlays()
-        self.draw_fret_label()
-        self.draw_strings()
-        self.draw_nut()
-        self.draw_markers()
-        self.draw_title()
+        return drawing
+
+    def draw(self):
+        """
+        Return a new svgwrite Drawing of the fretboard. The fretboard itself
+        is left untouched, so it can be drawn from several threads at once.
+        """
+        drawing = self.new_drawing()
+
+        layout = self.calculate_layout()
+        self.draw_frets(drawing, layout)
+        self.draw_inlays(drawing, layout)
+        self.draw_fret_label(drawing, layout)
+        self.draw_strings(drawing, layout)
+        self.draw_string_labels(drawing, layout)
+        self.draw_nut(drawing, layout)
+        self.draw_markers(drawing, layout)
+        self.draw_title(drawing, layout)
+
+        return drawing
 
     def render(self, output=None):
-        self.draw()
+        drawing = self.draw()
 
         if output is None:
             output = StringIO()
 
-        self.drawing.write(output)
+        drawing.write(output)
         return output
 
     def save(self, filename):
@@ -444,13 +474,19 @@ class Fretboard(object):
 class GuitarFretboard(Fretboard):
     string_count = 6
     inlays = (3, 5, 7, 9)
+    # MIDI note numbers of the open strings, E2 A2 D3 G3 B3 E4
+    tuning = (40, 45, 50, 55, 59, 64)
 
 
 class BassFretboard(Fretboard):
     string_count = 4
     inlays = (3, 5, 7, 9)
+    # E1 A1 D2 G2
+    tuning = (28, 33, 38, 43)
 
 
 class UkuleleFretboard(Fretboard):
     string_count = 4
     inlays = (3, 5, 7, 10)
+    # re-entrant G4 C4 E4 A4
+    tuning = (67, 60, 64, 69)
@@ -0,0 +1,260 @@
+"""
+Compact export of diagram geometry, for drawing in the browser with
+`diagram/static/geometry.js` instead of shipping SVG.
+
+Each `Fretboard.draw_*` stage is recorded as a layer of primitives. A
+primitive is a flat run of numbers: its kind, an index into the style table,
+then its coordinates (rounded to 0.1px).
+
+    line    0, style, x1, y1, x2, y2
+    circle  1, style, cx, cy, r
+    rect    2, style, x, y, width, height
+    text    3, style, x, y, index into the text table
+
+The style table holds the SVG attributes of every style a fretboard of that
+class and style can use, one slot per role (frets, nut, each string, inlays,
+markers, barres, open/muted labels, fret label, title) in a fixed order.
+Every chord with the same style or theme therefore shares one table,
+identified by a short hash, so clients can fetch and cache it once and leave
+it out of each diagram. Only styles outside those roles, e.g. a marker given
+its own color, are appended and change the id.
+
+The binary form is little-endian:
+
+    b'FBG1', width (uint16), height (uint16), style id (8 ascii bytes)
+    text count (uint8), then each text as length (uint8) + utf-8 bytes
+    layer count (uint8), then each layer as
+        layer id (uint8), primitive count (uint16), then per primitive
+        kind (uint8), style (uint8), coordinates (int16, in 0.1px)
+
+so the drawing and every coordinate in it must lie within 3276.7px of the
+origin; larger drawings raise ValueError.
+"""
+import hashlib
+import itertools
+import json
+import struct
+from functools import lru_cache
+
+LINE, CIRCLE, RECT, TEXT = range(4)
+
+# Layers in painting order. Text of every stage but the title is collected
+# in 'labels', on top of the shapes it annotates.
+LAYERS = (
+    'background', 'frets', 'inlays', 'strings', 'nut',
+    'barres', 'markers', 'labels', 'title',
+)
+
+MAGIC = b'FBG1'
+
+# largest coordinate an int16 holds in 0.1px
+MAX_COORDINATE = 32767
+
+
+class Recorder(object):
+    """
+    Stands in for an svgwrite Drawing while the draw_* stages run,
+    recording primitives instead of building SVG elements.
+    """
+
+    def __init__(self, styles=()):
+        self.layers = dict((name, []) for name in LAYERS)
+        self.layer = None
+        self.styles = []
+        self.style_index = {}
+        self.texts = []
+        self.text_index = {}
+
+        for attribs in styles:
+            self.style(attribs)
+
+    def style(self, attribs):
+        key = tuple(sorted(
+            (name.replace('_', '-'), value) for name, value in attribs.items()
+            if value is not None))
+        if key not in self.style_index:
+            self.style_index[key] = len(self.styles)
+            self.styles.append(dict(key))
+        return self.style_index[key]
+
+    def line(self, start, end, **attribs):
+        return (LINE, self.style(attribs), start + end)
+
+    def circle(self, center, r, **attribs):
+        return (CIRCLE, self.style(attribs), center + (r,))
+
+    def rect(self, insert, size, **attribs):
+        return (RECT, self.style(attribs), insert + size)
+
+    def text(self, text, insert, **attribs):
+        text = str(text)
+        if text not in self.text_index:
+            self.text_index[text] = len(self.texts)
+            self.texts.append(text)
+        return (TEXT, self.style(attribs), insert + (self.text_index[text],))
+
+    def add(self, primitive):
+        kind, style, values = primitive
+        layer = self.layer
+        if kind == TEXT and layer != 'title':
+            layer = 'labels'
+        self.layers[layer].append((kind, style, tuple(round(v, 1) for v in values)))
+
+
+def run_stages(recorder, fretboard):
+    layout = fretboard.calculate_layout()
+    style = fretboard.style
+
+    if style.drawing.background_color is not None:
+        recorder.layer = 'background'
+        recorder.add(recorder.rect(
+            (0, 0), (style.drawing.width, style.drawing.height),
+            fill=style.drawing.background_color))
+
+    for layer, stage in (
+            ('frets', fretboard.draw_frets),
+            ('inlays', fretboard.draw_inlays),
+            ('frets', fretboard.draw_fret_label),
+            ('strings', fretboard.draw_strings),
+            ('strings', fretboard.draw_string_labels),
+            ('nut', fretboard.draw_nut),
+            ('title', fretboard.draw_title)):
+        recorder.layer = layer
+        stage(recorder, layout)
+
+    for marker in fretboard.markers:
+        if isinstance(marker.string, (list, tuple)):
+            recorder.layer = 'barres'
+            fretboard.draw_barre(recorder, layout, marker)
+        else:
+            recorder.layer = 'markers'
+            fretboard.draw_marker(recorder, layout, marker)
+
+
+def style_table(fretboard):
+    """
+    The style table shared by every fretboard of the same class, string
+    count, inlays and style as `fretboard`, as a tuple of attribute dicts.
+    """
+    canonical = json.dumps(fretboard.style, sort_keys=True, default=dict)
+    return _style_table(type(fretboard), len(fretboard.strings),
+                        tuple(fretboard.inlays or ()), canonical)
+
+
+@lru_cache(maxsize=256)
+def _style_table(fretboard_cls, strings, inlays, style):
+    # Record fretboards that between them use every role: one in open
+    # position for the nut, one up the neck for the fret label and inlays.
+    style = json.loads(style)
+    recorder = Recorder()
+    for frets in ((0, 4), (9, 13)):
+        probe = fretboard_cls(strings=strings, frets=frets, inlays=inlays,
+                              title='title', style=style)
+        probe.add_string_label(0, 'O', font_color=probe.style.string.open_font_color)
+        probe.add_string_label(1, 'X', font_color=probe.style.string.muted_font_color)
+        probe.add_string_label(2, 'X')
+        probe.add_barre(fret=frets[0] + 1, strings=(0, strings - 1), finger='1')
+        probe.add_marker(string=1, fret=frets[0] + 2, label='2')
+        run_stages(recorder, probe)
+    return tuple(recorder.styles)
+
+
+def record(fretboard):
+    """
+    Run the draw stages of `fretboard` (or a chord's fretboard) against a
+    Recorder seeded with its style table.
+    """
+    if not hasattr(fretboard, 'calculate_layout'):
+        fretboard = fretboard.draw()
+
+    recorder = Recorder(style_table(fretboard))
+    run_stages(recorder, fretboard)
+
+    style = fretboard.style
+    return recorder, (style.drawing.width, style.drawing.height)
+
+
+def style_id(styles):
+    canonical = json.dumps(styles, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:8]
+
+
+def number(value):
+    return int(value) if value == int(value) else value
+
+
+def to_dict(fretboard, include_styles=True):
+    recorder, size = record(fretboard)
+    data = {
+        'v': 1,
+        'size': list(size),
+        'style': style_id(recorder.styles),
+        'text': recorder.texts,
+        'layers': [
+            [name, [number(v) for kind, style, values in recorder.layers[name]
+                    for v in (kind, style) + values]]
+            for name in LAYERS if recorder.layers[name]
+        ],
+    }
+    if include_styles:
+        data['styles'] = recorder.styles
+    return data
+
+
+def to_json(fretboard, include_styles=True):
+    """
+    Geometry of a fretboard or chord as a JSON string.
+    """
+    return json.dumps(to_dict(fretboard, include_styles), separators=(',', ':'))
+
+
+def styles_json(fretboard):
+    """
+    The style table referenced by the geometry of `fretboard`, as JSON.
+    """
+    recorder, _ = record(fretboard)
+    return json.dumps({'style': style_id(recorder.styles), 'styles': recorder.styles},
+                      separators=(',', ':'))
+
+
+def to_binary(fretboard):
+    """
+    Geometry of a fretboard or chord packed as bytes, see the module
+    docstring for the layout. Styles are referenced by id only.
+    """
+    recorder, size = record(fretboard)
+    if len(recorder.styles) > 255 or len(recorder.texts) > 255:
+        raise ValueError('too many styles or labels for the binary format')
+
+    coordinates = itertools.chain(size, (
+        v
+        for primitives in recorder.layers.values()
+        for kind, _, values in primitives
+        for v in (values[:-1] if kind == TEXT else values)
+    ))
+    if any(abs(round(v * 10)) > MAX_COORDINATE for v in coordinates):
+        raise ValueError('drawing too large for the binary format (over %gpx)' % (MAX_COORDINATE / 10.))
+
+    parts = [
+        MAGIC,
+        struct.pack('<HH', *(int(round(v)) for v in size)),
+        style_id(recorder.styles).encode('ascii'),
+        struct.pack('<B', len(recorder.texts)),
+    ]
+    for text in recorder.texts:
+        encoded = text.encode('utf-8')[:255]
+        parts.append(struct.pack('<B', len(encoded)) + encoded)
+
+    layers = [(index, recorder.layers[name]) for index, name in enumerate(LAYERS)
+              if recorder.layers[name]]
+    parts.append(struct.pack('<B', len(layers)))
+    for index, primitives in layers:
+        parts.append(struct.pack('<BH', index, len(primitives)))
+        for kind, style, values in primitives:
+            if kind == TEXT:
+                coords = [int(round(v * 10)) for v in values[:-1]] + [values[-1]]
+            else:
+                coords = [int(round(v * 10)) for v in values]
+            parts.append(struct.pack('<BB%dh' % len(coords), kind, style, *coords))
+
+    return b''.join(parts)
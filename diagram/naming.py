@@ -0,0 +1,140 @@
+"""
+Name chords from their positions.
+
+Fretted positions plus the instrument tuning give a set of pitch classes,
+held as a 12-bit mask, and a bass note. Every (mask, bass) pair is looked
+up in a table built once at import, so naming a voicing costs a handful of
+additions and a list index.
+"""
+import collections
+
+from .shape import MUTED, parse_chord
+
+NOTE_NAMES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+
+# Chord qualities and their intervals in semitones above the root. When a
+# set of notes fits several names, the one listed first wins, unless
+# another has the bass note as its root.
+CHORD_TYPES = (
+    ('', (0, 4, 7)),
+    ('m', (0, 3, 7)),
+    ('7', (0, 4, 7, 10)),
+    ('maj7', (0, 4, 7, 11)),
+    ('m7', (0, 3, 7, 10)),
+    ('5', (0, 7)),
+    ('sus4', (0, 5, 7)),
+    ('sus2', (0, 2, 7)),
+    ('dim', (0, 3, 6)),
+    ('aug', (0, 4, 8)),
+    ('6', (0, 4, 7, 9)),
+    ('m6', (0, 3, 7, 9)),
+    ('dim7', (0, 3, 6, 9)),
+    ('m7b5', (0, 3, 6, 10)),
+    ('mMaj7', (0, 3, 7, 11)),
+    ('7sus4', (0, 5, 7, 10)),
+    ('add9', (0, 2, 4, 7)),
+    ('madd9', (0, 2, 3, 7)),
+    ('add11', (0, 4, 5, 7)),
+    ('6/9', (0, 2, 4, 7, 9)),
+    ('9', (0, 2, 4, 7, 10)),
+    ('maj9', (0, 2, 4, 7, 11)),
+    ('m9', (0, 2, 3, 7, 10)),
+    ('7b5', (0, 4, 6, 10)),
+    ('7#5', (0, 4, 8, 10)),
+    ('7b9', (0, 1, 4, 7, 10)),
+    ('7#9', (0, 3, 4, 7, 10)),
+    ('maj7#11', (0, 4, 6, 7, 11)),
+    ('11', (0, 2, 4, 5, 7, 10)),
+    ('m11', (0, 2, 3, 5, 7, 10)),
+    ('13', (0, 2, 4, 7, 9, 10)),
+)
+
+
+class ChordName(collections.namedtuple('ChordName', ('root', 'quality', 'bass', 'inversion'))):
+    """
+    root and bass are pitch classes (0 = C). inversion is 0 in root
+    position, 1 with the next chord tone in the bass, and so on.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        name = NOTE_NAMES[self.root] + self.quality
+        if self.bass != self.root:
+            name += '/' + NOTE_NAMES[self.bass]
+        return name
+
+
+def interval_mask(intervals, root=0):
+    mask = 0
+    for interval in intervals:
+        mask |= 1 << ((root + interval) % 12)
+    return mask
+
+
+def build_index():
+    """
+    Return a list indexed by `mask * 12 + bass` holding the preferred
+    ChordName for that set of notes, or None.
+    """
+    # Chords with the fifth left out are common voicings too, but any
+    # complete chord matching the same notes is preferred.
+    types = list(CHORD_TYPES)
+    for quality, intervals in CHORD_TYPES:
+        if len(intervals) >= 4 and 7 in intervals:
+            types.append((quality, tuple(i for i in intervals if i != 7)))
+
+    candidates = collections.defaultdict(list)
+    for priority, (quality, intervals) in enumerate(types):
+        for root in range(12):
+            candidates[interval_mask(intervals, root)].append(
+                (priority, root, quality, intervals))
+
+    index = [None] * (4096 * 12)
+    for mask, names in candidates.items():
+        names.sort()
+        for bass in range(12):
+            if not mask & (1 << bass):
+                continue
+            rooted = [name for name in names if name[1] == bass]
+            priority, root, quality, intervals = (rooted or names)[0]
+            inversion = sorted(intervals).index((bass - root) % 12)
+            index[mask * 12 + bass] = ChordName(root, quality, bass, inversion)
+    return index
+
+
+INDEX = build_index()
+
+
+def identify_shape(shape, tuning):
+    """
+    Name a ChordShape played on an instrument tuned to `tuning`, a sequence
+    of MIDI note numbers from the lowest string. Returns a ChordName or None.
+    """
+    mask = 0
+    bass = None
+    for open_note, fret in zip(tuning, shape.frets):
+        if fret == MUTED:
+            continue
+        note = open_note + fret
+        mask |= 1 << (note % 12)
+        if bass is None or note < bass:
+            bass = note
+    if bass is None:
+        return None
+    return INDEX[mask * 12 + bass % 12]
+
+
+def identify(positions, tuning):
+    """
+    Name a chord given its positions in any form Chord accepts, e.g.
+    identify('x32010', GuitarFretboard.tuning).
+    """
+    return identify_shape(parse_chord(positions), tuning)
+
+
+def identify_many(positions, tuning):
+    """
+    Name each of an iterable of positions, yielding ChordNames or None.
+    """
+    for item in positions:
+        yield identify_shape(parse_chord(item), tuning)
@@ -0,0 +1,166 @@
+import copy
+
+from .compat import StringIO
+
+# Widest range of frets shown at once, beyond which each chord is drawn
+# over its own frets rather than one range covering every chord.
+MAX_SHARED_FRETS = 7
+
+
+class GroupTarget(object):
+    """
+    Lets the fretboard draw_* stages add their elements to an SVG group
+    instead of the top level of the drawing.
+    """
+
+    def __init__(self, drawing, group):
+        self.drawing = drawing
+        self.group = group
+
+    def add(self, element):
+        return self.group.add(element)
+
+    def __getattr__(self, name):
+        # element factories, e.g. line(), circle(), text()
+        return getattr(self.drawing, name)
+
+
+class Progression(object):
+    """
+    Animate a chord progression in a single SVG.
+
+    The fretboard is drawn once, over a fret range wide enough for every
+    chord. Each distinct chord adds only its markers, string labels and
+    title as a frame, and SMIL timing shows the frames in turn. When that
+    range would span more than MAX_SHARED_FRETS frets, e.g. an open G and a
+    chord at the 12th fret, the markers would crowd together, so instead
+    each frame holds a whole fretboard over its chord's own frets.
+
+    chords = list of chords for the same instrument, e.g. GuitarChord.
+
+    durations = seconds each chord is shown, either one number for all of
+    them or a list with one per chord.
+
+    loop = start again from the first chord after the last one.
+    """
+
+    def __init__(self, chords, durations=1.0, loop=True):
+        if not chords:
+            raise ValueError('a progression needs at least one chord')
+        self.chords = list(chords)
+
+        if isinstance(durations, (int, float)):
+            durations = [durations] * len(self.chords)
+        if len(durations) != len(self.chords):
+            raise ValueError('expected one duration per chord')
+        self.durations = list(durations)
+
+        self.loop = loop
+
+    def get_fret_range(self):
+        """
+        Return the (first, last) fret range shared by every chord, or None
+        when it would span more than MAX_SHARED_FRETS frets.
+        """
+        ranges = [chord.get_fret_range() for chord in self.chords]
+        first = min(first for first, _ in ranges)
+        last = max(last for _, last in ranges)
+        if last - first > MAX_SHARED_FRETS:
+            return None
+        return (first, last)
+
+    def draw(self):
+        """
+        Return a new svgwrite Drawing with the skeleton and one frame per
+        chord.
+        """
+        frets = self.get_fret_range()
+        first = self.chords[0]
+
+        # Reserve room for a title if any chord has one, so every frame
+        # shares the same layout.
+        title = next((chord.title for chord in self.chords if chord.title), None)
+        skeleton = first.fretboard_cls(
+            strings=first.strings,
+            frets=frets or first.get_fret_range(),
+            inlays=first.inlays,
+            title=title,
+            style=first.style,
+        )
+        drawing = skeleton.new_drawing()
+        if frets is not None:
+            layout = skeleton.calculate_layout()
+            skeleton.draw_frets(drawing, layout)
+            skeleton.draw_inlays(drawing, layout)
+            skeleton.draw_fret_label(drawing, layout)
+            skeleton.draw_strings(drawing, layout)
+            skeleton.draw_nut(drawing, layout)
+
+        # An invisible element whose animation paces all the frames
+        total = sum(self.durations)
+        clock = drawing.rect(insert=(0, 0), size=(0, 0))
+        clock.add(drawing.animate(
+            id='clock',
+            attributeName='x',
+            values='0;0',
+            dur='%gs' % total,
+            begin='0s;clock.end' if self.loop else '0s',
+        ))
+        drawing.add(clock)
+
+        # Each distinct chord is drawn once, repeats refer back to it
+        frames = {}
+        start = 0
+        for index, (chord, duration) in enumerate(zip(self.chords, self.durations)):
+            key = chord.cache_key()
+            if key not in frames:
+                fretboard = chord.draw(frets=frets)
+                frames[key] = frame_id = 'frame-%d' % len(frames)
+
+                frame = drawing.g(id=frame_id, class_='frame')
+                target = GroupTarget(drawing, frame)
+                if frets is None:
+                    # laid out as if titled like the others, so the frets
+                    # don't jump between frames
+                    titled = copy.copy(fretboard)
+                    titled.title = title
+                    layout = titled.calculate_layout()
+                    fretboard.draw_frets(target, layout)
+                    fretboard.draw_inlays(target, layout)
+                    fretboard.draw_fret_label(target, layout)
+                    fretboard.draw_strings(target, layout)
+                    fretboard.draw_nut(target, layout)
+                fretboard.draw_string_labels(target, layout)
+                fretboard.draw_markers(target, layout)
+                fretboard.draw_title(target, layout)
+                drawing.defs.add(frame)
+
+            step = drawing.use(href='#' + frames[key], visibility='hidden')
+            show = drawing.set(
+                attributeName='visibility',
+                to='visible',
+                begin='clock.begin+%gs' % start,
+                dur='%gs' % duration,
+            )
+            if index == len(self.chords) - 1 and not self.loop:
+                # stay on the last chord once the progression is over
+                show['fill'] = 'freeze'
+            step.add(show)
+            drawing.add(step)
+
+            start += duration
+
+        return drawing
+
+    def render(self, output=None):
+        drawing = self.draw()
+
+        if output is None:
+            output = StringIO()
+
+        drawing.write(output)
+        return output
+
+    def save(self, filename):
+        with open(filename, 'w') as output:
+            self.render(output)
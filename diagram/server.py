@@ -0,0 +1,222 @@
+"""
+A small HTTP server rendering chord diagrams on request, e.g.
+
+    GET /chord/guitar/xx0232.svg?fingers=---132&title=D
+
+Run it with `python -m diagram.server --port 8000`.
+"""
+import argparse
+import collections
+import gzip
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .chord import GuitarChord, BassChord, UkuleleChord
+
+INSTRUMENTS = {
+    'guitar': GuitarChord,
+    'bass': BassChord,
+    'ukulele': UkuleleChord,
+}
+
+Rendered = collections.namedtuple('Rendered', ('etag', 'svg', 'gzipped'))
+
+
+class RenderCache(object):
+    """
+    Rendered chords by spec, kept with a precompressed copy.
+
+    Concurrent requests for the same chord are coalesced: the first one
+    renders, the others wait for its result instead of rendering again.
+
+    maxsize = number of rendered chords to keep, least recently used are
+    dropped first.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.rendered = collections.OrderedDict()
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def get(self, chord):
+        key = chord.cache_key()
+
+        with self.lock:
+            if key in self.rendered:
+                self.rendered.move_to_end(key)
+                return self.rendered[key]
+            waiter = self.pending.get(key)
+            if waiter is None:
+                waiter = self.pending[key] = [threading.Event(), None]
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            waiter[0].wait()
+            if isinstance(waiter[1], Exception):
+                raise waiter[1]
+            return waiter[1]
+
+        try:
+            svg = chord.render(io.BytesIO()).getvalue()
+            result = Rendered(
+                etag='"%s"' % key.hex(),
+                svg=svg,
+                gzipped=gzip.compress(svg),
+            )
+        except Exception as e:
+            result = e
+
+        with self.lock:
+            del self.pending[key]
+            if not isinstance(result, Exception):
+                self.rendered[key] = result
+                while len(self.rendered) > self.maxsize:
+                    self.rendered.popitem(last=False)
+        waiter[1] = result
+        waiter[0].set()
+
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def parse_request(path):
+    """
+    Map a request path such as '/chord/guitar/x-x-0-14-15-14.svg?title=C'
+    to a chord. Raises LookupError for unknown paths and ValueError for bad
+    parameters.
+    """
+    url = urlsplit(path)
+    parts = url.path.strip('/').split('/')
+    if len(parts) != 3 or parts[0] != 'chord' or not parts[2].endswith('.svg'):
+        raise LookupError(url.path)
+
+    try:
+        chord_cls = INSTRUMENTS[parts[1]]
+    except KeyError:
+        raise LookupError(parts[1])
+
+    query = dict((k, v[-1]) for k, v in parse_qs(url.query).items())
+    kwargs = {
+        'positions': unquote(parts[2][:-len('.svg')]),
+        'fingers': query.get('fingers'),
+        'title': query.get('title'),
+    }
+    if 'barre' in query:
+        kwargs['barre'] = int(query['barre'])
+
+    chord = chord_cls(**kwargs)
+
+    # a barre can only be drawn across a fret the chord actually plays
+    shape = chord.shape
+    if chord.barre is not None:
+        if chord.barre not in shape.positions:
+            raise ValueError('barre %d is not a fret in %s' % (chord.barre, kwargs['positions']))
+    elif shape.barre is not None and shape.barre.fret is None:
+        raise ValueError('barre finger %s starts on a muted string' % shape.barre.finger)
+
+    return chord
+
+
+def accepts_gzip(accept_encoding):
+    """
+    Whether an Accept-Encoding header allows gzip, honouring q-values: e.g.
+    'gzip;q=0' refuses it, and '*' allows it unless gzip is refused.
+    """
+    qvalues = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[coding.strip().lower()] = q
+
+    for coding in ('gzip', 'x-gzip', '*'):
+        if coding in qvalues:
+            return qvalues[coding] > 0
+    return False
+
+
+class ChordRequestHandler(BaseHTTPRequestHandler):
+    cache = RenderCache()
+
+    def do_HEAD(self):
+        self.respond(body=False)
+
+    def do_GET(self):
+        self.respond(body=True)
+
+    def respond(self, body):
+        try:
+            rendered = self.cache.get(parse_request(self.path))
+        except LookupError:
+            return self.send_error(404)
+        except ValueError as e:
+            return self.send_error(400, str(e))
+        except Exception as e:
+            self.log_error('rendering %s failed: %r', self.path, e)
+            return self.send_error(500)
+
+        # Strong ETags differ per content-coding, so the gzipped
+        # representation gets its own tag.
+        etag = rendered.etag
+        content = rendered.svg
+        if accepts_gzip(self.headers.get('Accept-Encoding', '')):
+            etag = rendered.etag[:-1] + '-gzip"'
+            content = rendered.gzipped
+
+        # If-None-Match uses the weak comparison, so W/"..." matches too
+        etags = [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]
+        etags = [tag[2:] if tag.startswith('W/') else tag for tag in etags]
+        if etag in etags or '*' in etags:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        if content is rendered.gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Type', 'image/svg+xml')
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('ETag', etag)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Cache-Control', 'public, max-age=86400')
+        self.end_headers()
+        if body:
+            self.wfile.write(content)
+
+
+def make_server(host='localhost', port=8000):
+    return ThreadingHTTPServer((host, port), ChordRequestHandler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve chord diagrams over HTTP.')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port)
+    print('Serving chord diagrams on http://%s:%d/' % server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+from collections import namedtuple
+
+# Sentinel stored in ChordShape.frets for a muted (or missing) string.
+MUTED = 0xFF
+_MUTED_BYTE = bytes((MUTED,))
+
+Barre = namedtuple('Barre', ('fret', 'first_string', 'last_string', 'finger'))
+
+
+class ChordShape(namedtuple('ChordShape', (
+        'frets', 'positions', 'fingers', 'min_fret', 'max_fret', 'barre'))):
+    """
+    Immutable, compact representation of a chord voicing.
+
+    frets = bytes, one fret number per string, with MUTED for muted
+    strings and 0 for open strings.
+
+    positions = the same as a tuple of ints, with None for muted strings.
+
+    fingers = tuple of finger labels as given by the user.
+
+    min_fret = lowest fretted (non-open) position, or None.
+
+    max_fret = highest position including open strings, or None if every
+    string is muted.
+
+    barre = a Barre inferred from repeated finger numbers, or None.
+    """
+    __slots__ = ()
+
+    def fret(self, string):
+        """
+        Return the fret played on `string`, or None when it is muted or
+        outside the shape.
+        """
+        if string < len(self.frets):
+            fret = self.frets[string]
+            if fret != MUTED:
+                return fret
+        return None
+
+    def finger(self, string):
+        if string < len(self.fingers):
+            return self.fingers[string]
+        return None
+
+    def get_fret_range(self):
+        if self.max_fret is None or self.max_fret < 5:
+            first_fret = 0
+        else:
+            first_fret = self.min_fret
+        return (first_fret, first_fret + 4)
+
+
+# bytes.translate() table for the compact form, e.g. 'xx0232': digits map
+# to their fret number and anything else to MUTED.
+_COMPACT_FRETS = bytearray([MUTED]) * 256
+_COMPACT_FRETS[ord('0'):ord('9') + 1] = range(10)
+_COMPACT_FRETS = bytes(_COMPACT_FRETS)
+
+
+class _FretNumbers(dict):
+    """
+    Fret number of a per-string item, with the usual values precomputed.
+    Only frets 0 to 254 fit in a byte next to MUTED, so any other number
+    is rejected here.
+    """
+
+    def __missing__(self, item):
+        if isinstance(item, int):
+            fret = item
+        elif isinstance(item, str) and item.isdigit():
+            fret = int(item)
+        else:
+            return MUTED
+        if not 0 <= fret < MUTED:
+            raise ValueError('position %r is not a fret between 0 and %d' % (item, MUTED - 1))
+        return fret
+
+
+_FRET_NUMBERS = _FretNumbers((str(fret), fret) for fret in range(MUTED))
+_FRET_NUMBERS.update((fret, fret) for fret in range(MUTED))
+_FRET_NUMBERS.update({'x': MUTED, 'X': MUTED, '': MUTED, None: MUTED})
+
+
+def split_positions(positions):
+    """
+    Split the various forms of position defs ('xx0232', 'x-x-0-14-15-14',
+    5333, ['x', 'x', 0, 2, 3, 2]) into a sequence of per-string items.
+    """
+    if positions is None:
+        return ()
+    if isinstance(positions, int):
+        # oops,. did we put in something like 5333 without quoting?
+        positions = str(positions)
+    if isinstance(positions, str) and '-' in positions:
+        # use - to separate numbers when frets go above 9, e.g., x-x-0-10-10-10
+        return positions.split('-')
+    return positions
+
+
+def split_fingers(fingers):
+    if not fingers:
+        return ()
+    try:
+        return tuple(fingers)
+    except TypeError:
+        return tuple(str(fingers))
+
+
+def parse_chord(positions=None, fingers=None):
+    """
+    Parse positions and fingers into a ChordShape. The common string forms
+    are converted with bytes operations rather than per-string Python code,
+    and nothing is allocated for the barre unless the fingers have one.
+    """
+    if isinstance(positions, str):
+        if '-' in positions:
+            frets = bytes(map(_FRET_NUMBERS.__getitem__, positions.split('-')))
+        else:
+            frets = positions.encode('latin-1', 'replace').translate(_COMPACT_FRETS)
+    else:
+        frets = bytes(map(_FRET_NUMBERS.__getitem__, split_positions(positions)))
+
+    played = frets.replace(_MUTED_BYTE, b'')
+    if played:
+        max_fret = max(played)
+        fretted = played.replace(b'\0', b'')
+        min_fret = min(fretted) if fretted else None
+    else:
+        min_fret = max_fret = None
+
+    # A barre is the first finger number (in string order) that appears on
+    # more than one string. Finger strings are searched with str methods,
+    # and ruled out up front when no label but '-' repeats.
+    barre = first_string = None
+    if isinstance(fingers, str):
+        labels = fingers.replace('-', '')
+        if len(set(labels)) < len(labels):
+            for finger in labels:
+                if labels.count(finger) > 1 and finger.isdigit():
+                    first_string = fingers.index(finger)
+                    last_string = fingers.rindex(finger)
+                    break
+        fingers = tuple(fingers)
+    else:
+        fingers = split_fingers(fingers)
+        for index, finger in enumerate(fingers):
+            if fingers.count(finger) > 1 and (isinstance(finger, int) or finger.isdigit()):
+                first_string = index
+                last_string = len(fingers) - 1 - fingers[::-1].index(finger)
+                break
+
+    if first_string is not None:
+        fret = frets[first_string] if first_string < len(frets) else MUTED
+        barre = Barre(None if fret == MUTED else fret, first_string, last_string, finger)
+
+    return ChordShape(
+        frets,
+        tuple([None if fret == MUTED else fret for fret in frets]),
+        fingers,
+        min_fret,
+        max_fret,
+        barre,
+    )
@@ -0,0 +1,404 @@
+"""
+Print-ready PDF songbooks of chord diagrams, titles and lyrics.
+
+Pages are written to the output as soon as they're full, and each distinct
+chord is drawn once into a PDF form XObject that every page showing it
+refers to, so repeated chords cost a few bytes each. Pages hang off a tree
+of /Pages nodes written as they fill up, so memory use doesn't grow with the
+page count beyond 8 bytes per PDF object, for the cross-reference table.
+
+    with Songbook('songbook.pdf') as book:
+        book.add_title("Knockin' on Heaven's Door")
+        book.add_chords([GuitarChord('320033', title='G'), ...])
+        book.add_text('Mama, take this badge off of me')
+"""
+from array import array
+import zlib
+
+from .colors import to_rgb
+
+A4 = (595.28, 841.89)
+LETTER = (612, 792)
+
+# Helvetica-Bold advance widths for ASCII 32-126, in 1/1000 em.
+CHAR_WIDTHS = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333,
+    278, 278, 556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333,
+    584, 584, 584, 611, 975, 722, 722, 722, 722, 667, 611, 778, 722, 278,
+    556, 722, 611, 833, 722, 778, 667, 778, 722, 667, 611, 722, 667, 944,
+    667, 667, 611, 333, 278, 333, 584, 556, 333, 556, 611, 556, 611, 556,
+    333, 611, 611, 278, 278, 556, 278, 889, 611, 611, 611, 611, 389, 556,
+    333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+
+FONTS = (
+    ('F1', 'Helvetica'),
+    ('F2', 'Helvetica-Bold'),
+    ('F3', 'Helvetica-BoldOblique'),
+)
+
+# Kids per node of the /Pages tree
+PAGES_PER_NODE = 32
+
+# Bezier control point distance for approximating a quarter circle.
+KAPPA = 0.5522847498
+
+
+def text_width(text, font_size):
+    width = 0
+    for char in text:
+        code = ord(char) - 32
+        width += CHAR_WIDTHS[code] if 0 <= code < len(CHAR_WIDTHS) else 556
+    return width * font_size / 1000.
+
+
+def num(value):
+    return ('%.2f' % float(value)).rstrip('0').rstrip('.')
+
+
+def pdf_string(text):
+    text = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return b'(' + text.encode('latin-1', 'replace') + b')'
+
+
+def color_op(color, operator):
+    rgb = to_rgb(color)
+    if rgb is None:
+        return None
+    return ' '.join(num(c) for c in rgb) + ' ' + operator
+
+
+class PDFWriter(object):
+    """
+    Minimal streaming PDF writer. Objects are written as soon as they're
+    added; only their byte offsets are kept for the cross-reference table.
+    """
+
+    def __init__(self, output):
+        self.output = output
+        # 0 marks an object reserved but not written yet
+        self.offsets = array('Q', [0])
+        self.position = 0
+        self.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def write(self, data):
+        self.output.write(data)
+        self.position += len(data)
+
+    def reserve(self):
+        """
+        Allocate an object number to be written later.
+        """
+        self.offsets.append(0)
+        return len(self.offsets) - 1
+
+    def add_object(self, body, number=None):
+        if number is None:
+            number = self.reserve()
+        self.offsets[number] = self.position
+        self.write(('%d 0 obj\n' % number).encode('ascii'))
+        self.write(body if isinstance(body, bytes) else body.encode('latin-1'))
+        self.write(b'\nendobj\n')
+        return number
+
+    def add_stream(self, dictionary, data, number=None):
+        data = zlib.compress(data)
+        body = ('<< %s /Length %d /Filter /FlateDecode >>\nstream\n' % (
+            dictionary, len(data))).encode('latin-1')
+        return self.add_object(body + data + b'\nendstream', number)
+
+    def close(self, root):
+        xref = self.position
+        self.write(('xref\n0 %d\n' % len(self.offsets)).encode('ascii'))
+        self.write(b'0000000000 65535 f \n')
+        for offset in self.offsets[1:]:
+            self.write(('%010d 00000 n \n' % offset).encode('ascii'))
+        self.write(('trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+            len(self.offsets), root, xref)).encode('ascii'))
+
+
+class PageTree(object):
+    """
+    Balanced tree of /Pages nodes, each written once it has PAGES_PER_NODE
+    kids. Only the open node of each level is kept in memory.
+    """
+
+    def __init__(self, pdf):
+        self.pdf = pdf
+        # open node per level, from the bottom: [object number, kids, pages]
+        self.levels = []
+
+    def parent(self, level=0):
+        """
+        Object number of the open node at `level`, reserved if needed.
+        """
+        while len(self.levels) <= level:
+            self.levels.append(None)
+        if self.levels[level] is None:
+            self.levels[level] = [self.pdf.reserve(), [], 0]
+        return self.levels[level][0]
+
+    def add(self, kid, pages=1, level=0):
+        """
+        Add a page, or a node holding `pages` pages, to the open node at
+        `level`, which must have been reserved with parent().
+        """
+        node = self.levels[level]
+        node[1].append(kid)
+        node[2] += pages
+        if len(node[1]) == PAGES_PER_NODE:
+            self.flush(level)
+
+    def flush(self, level):
+        number, kids, pages = self.levels[level]
+        self.levels[level] = None
+        self.write(number, kids, pages, self.parent(level + 1))
+        self.add(number, pages, level + 1)
+
+    def write(self, number, kids, pages, parent=None):
+        self.pdf.add_object('<< /Type /Pages %s/Kids [%s] /Count %d >>' % (
+            '' if parent is None else '/Parent %d 0 R ' % parent,
+            ' '.join('%d 0 R' % kid for kid in kids), pages), number)
+
+    def close(self):
+        """
+        Write the nodes still open and return the root's object number.
+        """
+        level = 0
+        while level < len(self.levels) - 1:
+            if self.levels[level] is not None:
+                self.flush(level)
+            level += 1
+        number, kids, pages = self.levels[-1]
+        self.write(number, kids, pages)
+        return number
+
+
+def drawing_to_pdf(drawing):
+    """
+    Translate the elements of a fretboard's svgwrite drawing to PDF content
+    stream operators, in SVG coordinates.
+    """
+    ops = []
+    for element in drawing.elements:
+        attribs = element.attribs
+        name = element.elementname
+
+        if name == 'rect':
+            fill = color_op(attribs.get('fill'), 'rg')
+            if fill:
+                ops.append('%s %s %s %s %s re f' % (
+                    fill, num(attribs['x']), num(attribs['y']),
+                    num(attribs['width']), num(attribs['height'])))
+
+        elif name == 'line':
+            stroke = color_op(attribs.get('stroke'), 'RG')
+            if stroke:
+                ops.append('q %s %s w %d J %s %s m %s %s l S Q' % (
+                    stroke, num(attribs.get('stroke-width', 1)),
+                    1 if attribs.get('stroke-linecap') == 'round' else 0,
+                    num(attribs['x1']), num(attribs['y1']),
+                    num(attribs['x2']), num(attribs['y2'])))
+
+        elif name == 'circle':
+            fill = color_op(attribs.get('fill'), 'rg')
+            stroke = color_op(attribs.get('stroke'), 'RG')
+            if not (fill or stroke):
+                continue
+            x, y, r = float(attribs['cx']), float(attribs['cy']), float(attribs['r'])
+            k = r * KAPPA
+            path = [
+                '%s %s m' % (num(x + r), num(y)),
+                '%s %s %s %s %s %s c' % (num(x + r), num(y + k), num(x + k), num(y + r), num(x), num(y + r)),
+                '%s %s %s %s %s %s c' % (num(x - k), num(y + r), num(x - r), num(y + k), num(x - r), num(y)),
+                '%s %s %s %s %s %s c' % (num(x - r), num(y - k), num(x - k), num(y - r), num(x), num(y - r)),
+                '%s %s %s %s %s %s c' % (num(x + k), num(y - r), num(x + r), num(y - k), num(x + r), num(y)),
+            ]
+            state = [op for op in (fill, stroke) if op]
+            if stroke:
+                state.append('%s w' % num(attribs.get('stroke-width', 1)))
+            paint = 'B' if fill and stroke else ('f' if fill else 'S')
+            ops.append('q %s %s %s Q' % (' '.join(state), ' '.join(path), paint))
+
+        elif name == 'text':
+            text = str(element.text)
+            size = float(attribs.get('font-size', 12))
+            x, y = float(attribs['x']), float(attribs['y'])
+
+            anchor = attribs.get('text-anchor')
+            if anchor == 'middle':
+                x -= text_width(text, size) / 2
+            elif anchor == 'end':
+                x -= text_width(text, size)
+
+            # PDF places text on its baseline
+            baseline = attribs.get('dominant-baseline')
+            if baseline == 'hanging':
+                y += size * 0.75
+            elif baseline in ('middle', 'central'):
+                y += size * 0.35
+
+            font = 'F3' if attribs.get('font-style') == 'italic' else 'F2'
+            fill = color_op(attribs.get('fill'), 'rg') or '0 g'
+            # flip the text back up, the form's matrix turns y downwards
+            ops.append(('BT %s /%s %s Tf 1 0 0 -1 %s %s Tm ' % (
+                fill, font, num(size), num(x), num(y))).encode('latin-1')
+                + pdf_string(text) + b' Tj ET')
+
+    return b'\n'.join(op if isinstance(op, bytes) else op.encode('latin-1') for op in ops)
+
+
+class Songbook(object):
+    """
+    Lay out chord diagrams and text top to bottom on PDF pages, streaming
+    each page to `output` once it's full.
+
+    output = filename or binary file object.
+
+    page_size = (width, height) in points, e.g. A4 or LETTER.
+
+    columns = number of chord diagrams per row.
+    """
+
+    def __init__(self, output, page_size=A4, margin=36, columns=4, font_size=11, line_spacing=1.4):
+        if isinstance(output, str):
+            self.fileobj = self.output = open(output, 'wb')
+        else:
+            self.fileobj = None
+            self.output = output
+
+        self.page_width, self.page_height = page_size
+        self.margin = margin
+        self.columns = columns
+        self.font_size = font_size
+        self.line_spacing = line_spacing
+
+        self.pdf = PDFWriter(self.output)
+        self.catalog = self.pdf.reserve()
+        self.pages = PageTree(self.pdf)
+        self.page_count = 0
+        self.fonts = ' '.join(
+            '/%s %d 0 R' % (name, self.pdf.add_object(
+                '<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>' % font))
+            for name, font in FONTS
+        )
+
+        # object numbers of the drawn chords, by Chord.cache_key()
+        self.forms = {}
+
+        self.content = []
+        self.page_forms = set()
+        self.y = self.margin
+
+    @property
+    def width(self):
+        return self.page_width - 2 * self.margin
+
+    def ensure_space(self, height):
+        if self.y + height > self.page_height - self.margin and self.content:
+            self.new_page()
+
+    def new_page(self):
+        """
+        Write out the current page and start a new one.
+        """
+        content = self.pdf.add_stream('', b'\n'.join(self.content))
+        xobjects = ' '.join('/C%d %d 0 R' % (form, form) for form in sorted(self.page_forms))
+        page = self.pdf.add_object(
+            '<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] /Contents %d 0 R '
+            '/Resources << /Font << %s >> /XObject << %s >> >> >>' % (
+                self.pages.parent(), num(self.page_width), num(self.page_height), content,
+                self.fonts, xobjects))
+        self.pages.add(page)
+        self.page_count += 1
+
+        self.content = []
+        self.page_forms = set()
+        self.y = self.margin
+
+    def add_text(self, text, font_size=None, bold=False):
+        """
+        Add a paragraph of text, wrapped to the page width. Newlines start
+        new lines.
+        """
+        size = font_size or self.font_size
+        leading = size * self.line_spacing
+        font = 'F2' if bold else 'F1'
+
+        for paragraph in text.split('\n'):
+            line = ''
+            lines = []
+            for word in paragraph.split(' '):
+                candidate = line + ' ' + word if line else word
+                if line and text_width(candidate, size) > self.width:
+                    lines.append(line)
+                    line = word
+                else:
+                    line = candidate
+            lines.append(line)
+
+            for line in lines:
+                self.ensure_space(leading)
+                self.y += leading
+                self.content.append(('BT /%s %s Tf %s %s Td ' % (
+                    font, num(size), num(self.margin),
+                    # leave room below the baseline for descenders
+                    num(self.page_height - self.y + size * 0.25))).encode('latin-1')
+                    + pdf_string(line) + b' Tj ET')
+
+    def add_title(self, text, font_size=18):
+        self.add_text(text, font_size=font_size, bold=True)
+
+    def add_form(self, chord):
+        key = chord.cache_key()
+        if key not in self.forms:
+            fretboard = chord.draw()
+            width = fretboard.style.drawing.width
+            height = fretboard.style.drawing.height
+            self.forms[key] = (self.pdf.add_stream(
+                '/Type /XObject /Subtype /Form /BBox [0 0 %s %s] /Matrix [1 0 0 -1 0 %s] '
+                '/Resources << /Font << %s >> >>' % (
+                    num(width), num(height), num(height), self.fonts),
+                drawing_to_pdf(fretboard.draw()),
+            ), width, height)
+        return self.forms[key]
+
+    def add_chords(self, chords):
+        """
+        Add chord diagrams in rows of `columns`.
+        """
+        cell = self.width / self.columns
+        row = []
+        for chord in chords:
+            row.append(self.add_form(chord))
+            if len(row) == self.columns:
+                self.add_row(row, cell)
+                row = []
+        if row:
+            self.add_row(row, cell)
+
+    def add_row(self, row, cell):
+        scale = cell / max(width for _, width, _ in row)
+        height = max(height for _, _, height in row) * scale
+        self.ensure_space(height)
+        for index, (form, width, _) in enumerate(row):
+            self.page_forms.add(form)
+            self.content.append(('q %s 0 0 %s %s %s cm /C%d Do Q' % (
+                num(scale), num(scale), num(self.margin + cell * index),
+                num(self.page_height - self.y - height), form)).encode('latin-1'))
+        self.y += height
+
+    def close(self):
+        if self.content or not self.page_count:
+            self.new_page()
+        root = self.pages.close()
+        self.pdf.add_object('<< /Type /Catalog /Pages %d 0 R >>' % root, self.catalog)
+        self.pdf.close(self.catalog)
+        if self.fileobj is not None:
+            self.fileobj.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
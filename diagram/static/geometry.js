@@ -0,0 +1,110 @@
+/*
+ * Reference renderer for diagram.geometry output.
+ *
+ *   var svg = FretboardGeometry.render(geometry, styles);
+ *   document.body.appendChild(svg);
+ *
+ * `geometry` is the parsed JSON export, or the result of parseBinary() on
+ * an ArrayBuffer of the binary export. `styles` is the style table, from
+ * the JSON export itself or fetched once via styles_json() and cached by
+ * its `style` id.
+ */
+(function (root) {
+    'use strict';
+
+    var SVG_NS = 'http://www.w3.org/2000/svg';
+    var LAYERS = ['background', 'frets', 'inlays', 'strings', 'nut',
+                  'barres', 'markers', 'labels', 'title'];
+    // coordinates per primitive kind: line, circle, rect, text
+    var ARITY = [4, 3, 4, 3];
+    var ATTRIBUTES = [
+        ['x1', 'y1', 'x2', 'y2'],
+        ['cx', 'cy', 'r'],
+        ['x', 'y', 'width', 'height'],
+        ['x', 'y']
+    ];
+    var TAGS = ['line', 'circle', 'rect', 'text'];
+
+    function parseBinary(buffer) {
+        var view = new DataView(buffer);
+        var bytes = new Uint8Array(buffer);
+        var decoder = new TextDecoder('utf-8');
+        var offset = 4;
+        var geometry = {v: 1, text: [], layers: []};
+        var i, count;
+
+        if (decoder.decode(bytes.subarray(0, 4)) !== 'FBG1') {
+            throw new Error('not a fretboard geometry buffer');
+        }
+        geometry.size = [view.getUint16(offset, true), view.getUint16(offset + 2, true)];
+        offset += 4;
+        geometry.style = decoder.decode(bytes.subarray(offset, offset + 8));
+        offset += 8;
+
+        count = view.getUint8(offset++);
+        for (i = 0; i < count; i++) {
+            var length = view.getUint8(offset++);
+            geometry.text.push(decoder.decode(bytes.subarray(offset, offset + length)));
+            offset += length;
+        }
+
+        count = view.getUint8(offset++);
+        for (i = 0; i < count; i++) {
+            var name = LAYERS[view.getUint8(offset)];
+            var primitives = view.getUint16(offset + 1, true);
+            var ops = [];
+            offset += 3;
+            for (var p = 0; p < primitives; p++) {
+                var kind = view.getUint8(offset);
+                ops.push(kind, view.getUint8(offset + 1));
+                offset += 2;
+                for (var c = 0; c < ARITY[kind]; c++) {
+                    var value = view.getInt16(offset, true);
+                    // the text index is stored as is, coordinates in 0.1px
+                    ops.push(kind === 3 && c === 2 ? value : value / 10);
+                    offset += 2;
+                }
+            }
+            geometry.layers.push([name, ops]);
+        }
+        return geometry;
+    }
+
+    function render(geometry, styles) {
+        var svg = document.createElementNS(SVG_NS, 'svg');
+        var width = geometry.size[0], height = geometry.size[1];
+        styles = styles || geometry.styles;
+
+        svg.setAttribute('width', width);
+        svg.setAttribute('height', height);
+        svg.setAttribute('viewBox', '0 0 ' + width + ' ' + height);
+        svg.setAttribute('class', 'fretboard');
+
+        geometry.layers.forEach(function (layer) {
+            var ops = layer[1];
+            var i = 0;
+            while (i < ops.length) {
+                var kind = ops[i];
+                var style = styles[ops[i + 1]];
+                var element = document.createElementNS(SVG_NS, TAGS[kind]);
+                var names = ATTRIBUTES[kind];
+
+                for (var key in style) {
+                    element.setAttribute(key, style[key]);
+                }
+                for (var c = 0; c < names.length; c++) {
+                    element.setAttribute(names[c], ops[i + 2 + c]);
+                }
+                if (kind === 3) {
+                    element.textContent = geometry.text[ops[i + 4]];
+                }
+
+                svg.appendChild(element);
+                i += 2 + ARITY[kind];
+            }
+        });
+        return svg;
+    }
+
+    root.FretboardGeometry = {parseBinary: parseBinary, render: render};
+})(this);
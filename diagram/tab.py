@@ -0,0 +1,289 @@
+"""
+Tablature for whole pieces, streamed a page at a time.
+
+Events are (positions, duration) pairs, with positions in any form Chord
+accepts ('x32010', 'x-x-0-14-15-14', ['x', 3, 2, 0, 1, 0]) and duration
+in beats. Muted strings are left blank, and None positions are a rest.
+
+Events are read one measure at a time and placed on the current system,
+starting a new system (and page) when the measure doesn't fit. Only the
+measure being laid out and the page being drawn are held in memory, so a
+piece of any length renders in bounded memory and linear time.
+
+    tab = GuitarTablature(title='Stairway')
+    tab.save(events, 'stairway-%03d.svg')
+"""
+from attrdict import AttrDict
+import svgwrite
+
+from .fretboard import BassFretboard, GuitarFretboard, UkuleleFretboard
+from .shape import MUTED, parse_chord
+from .theme import get_theme
+
+A4 = (794, 1123)
+
+
+class Tablature(object):
+    """
+    Lay out a stream of events as tablature on SVG pages.
+
+    Fonts and colors come from the fretboard style, so a theme applies to
+    tablature and chord diagrams alike.
+
+    beats_per_measure = beats between bar lines.
+
+    beat_width = horizontal space for one beat, in px. Short events are
+    given at least enough room for their fret numbers, and long ones no
+    more than a whole system.
+
+    line_spacing = distance between the lines of a system, in px.
+    """
+    fretboard_cls = None
+
+    def __init__(
+            self,
+            title=None,
+            style=None,
+            theme=None,
+            beats_per_measure=4,
+            beat_width=40,
+            line_spacing=14,
+            page_size=A4,
+            margin=40,
+    ):
+        if theme is not None:
+            self.style = AttrDict(get_theme(theme).fretboard) + AttrDict(style or {})
+        else:
+            self.style = AttrDict(self.fretboard_cls.default_style) + AttrDict(style or {})
+
+        self.title = title
+        self.beats_per_measure = beats_per_measure
+        self.beat_width = beat_width
+        self.line_spacing = line_spacing
+        self.page_width, self.page_height = page_size
+        self.margin = margin
+
+        self.string_count = self.fretboard_cls.string_count
+        colors = self.style.string.colors or ()
+        self.string_colors = [
+            colors[index] if index < len(colors) else self.style.string.color
+            for index in range(self.string_count)
+        ]
+
+        self.font_size = self.line_spacing * 0.85
+        # room for a two digit fret number
+        self.min_event_width = self.font_size * 1.6
+        self.system_height = self.line_spacing * (self.string_count - 1)
+        self.system_spacing = self.line_spacing * 3
+
+    def measures(self, events):
+        """
+        Group events into measures of (frets, duration) columns, where
+        frets is a ChordShape.frets or None for a rest.
+
+        An event crossing a bar line ends its measure, and the beats it
+        holds past the bar count towards the next one, so later bar lines
+        stay on the beat grid.
+        """
+        measure = []
+        beats = 0
+        for positions, duration in events:
+            frets = None if positions is None else parse_chord(positions).frets
+            measure.append((frets, duration))
+            beats += duration
+            # allow for float durations such as 1/3 of a beat
+            if beats >= self.beats_per_measure - 1e-9:
+                yield measure
+                measure = []
+                beats %= self.beats_per_measure
+                if self.beats_per_measure - beats < 1e-9:
+                    beats = 0
+        if measure:
+            yield measure
+
+    def event_width(self, duration):
+        width = max(duration * self.beat_width, self.min_event_width)
+        # a long event still has to fit on a system of its own
+        return min(width, self.page_width - 2 * self.margin - self.min_event_width / 2)
+
+    def pages(self, events):
+        """
+        Yield a new svgwrite Drawing for each page of tablature, as soon as
+        it's full.
+        """
+        left = self.margin
+        right = self.page_width - self.margin
+        bottom = self.page_height - self.margin
+
+        drawing = lines = None
+        top = None
+        x = None
+
+        for measure in self.measures(events):
+            widths = [self.event_width(duration) for _, duration in measure]
+
+            # A measure wider than a whole system is wrapped between events
+            if x is not None and x + sum(widths) > right:
+                self.end_system(drawing, lines, top, x)
+                x = None
+
+            for (frets, _), width in zip(measure, widths):
+                if x is not None and x + width > right:
+                    self.end_system(drawing, lines, top, x)
+                    x = None
+
+                if x is None:
+                    # start a new system, on a new page if needed
+                    if drawing is not None:
+                        top += self.system_height + self.system_spacing
+                    if drawing is None or top + self.system_height > bottom:
+                        if drawing is not None:
+                            yield drawing
+                        drawing, lines, top = self.new_page(first=drawing is None)
+                    self.draw_bar(drawing, top, left)
+                    x = left + self.min_event_width / 2
+
+                self.draw_event(drawing, top, x + width / 2, frets)
+                x += width
+
+            self.draw_bar(drawing, top, x)
+
+        if drawing is not None:
+            self.end_system(drawing, lines, top, x)
+            yield drawing
+
+    def new_page(self, first):
+        """
+        Return an empty page, the group its system lines go in and the top
+        of its first system.
+        """
+        # svgwrite's attribute validation dominates the time on long pieces
+        drawing = svgwrite.Drawing(size=(self.page_width, self.page_height), debug=False)
+        drawing['class'] = 'tablature'
+
+        if self.style.drawing.background_color is not None:
+            drawing.add(
+                drawing.rect(
+                    insert=(0, 0),
+                    size=(self.page_width, self.page_height),
+                    fill=self.style.drawing.background_color
+                )
+            )
+
+        # system lines are only drawn once a system is complete, but belong
+        # behind everything else on the page
+        lines = drawing.add(drawing.g(class_='strings'))
+
+        top = self.margin
+        if first and self.title is not None:
+            drawing.add(
+                drawing.text(
+                    self.title,
+                    insert=(self.page_width / 2, top),
+                    font_family=self.style.title.font_family,
+                    font_size=self.style.title.font_size,
+                    font_weight='bold',
+                    fill=self.style.title.font_color,
+                    text_anchor='middle',
+                    dominant_baseline='hanging'
+                )
+            )
+            top += self.style.title.font_size + self.system_spacing
+
+        return drawing, lines, top
+
+    def string_y(self, top, string):
+        # the highest string is on the top line
+        return top + self.line_spacing * (self.string_count - 1 - string)
+
+    def end_system(self, drawing, lines, top, x):
+        """
+        Draw the lines of a system once its length is known, into the
+        `lines` group behind the fret numbers and bar lines.
+        """
+        for string in range(self.string_count):
+            y = self.string_y(top, string)
+            lines.add(
+                drawing.line(
+                    start=(self.margin, y),
+                    end=(x, y),
+                    stroke=self.string_colors[string],
+                    stroke_width=1
+                )
+            )
+
+    def draw_bar(self, drawing, top, x):
+        drawing.add(
+            drawing.line(
+                start=(x, top),
+                end=(x, top + self.system_height),
+                stroke=self.style.fret.color,
+                stroke_width=self.style.fret.size / 2.
+            )
+        )
+
+    def draw_event(self, drawing, top, x, frets):
+        if frets is None:
+            return
+
+        for string, fret in enumerate(frets[:self.string_count]):
+            if fret == MUTED:
+                continue
+            y = self.string_y(top, string)
+            label = str(fret)
+
+            # mask the line behind the number
+            width = self.font_size * 0.6 * len(label) + 2
+            drawing.add(
+                drawing.rect(
+                    insert=(x - width / 2, y - self.font_size / 2),
+                    size=(width, self.font_size),
+                    fill=self.style.drawing.background_color or 'white'
+                )
+            )
+            drawing.add(
+                drawing.text(
+                    label,
+                    insert=(x, y),
+                    font_family=self.style.drawing.font_family,
+                    font_size=self.font_size,
+                    fill=self.style.drawing.font_color,
+                    text_anchor='middle',
+                    dominant_baseline='central'
+                )
+            )
+
+    def render(self, events, open_page):
+        """
+        Write each page as soon as it's finished to the file object returned
+        by `open_page(page_number)`, which is closed once the page is
+        written. Each page is a separate SVG document. Returns the page
+        count.
+        """
+        if not callable(open_page):
+            raise TypeError('open_page must be a callable returning a file object per page')
+
+        count = 0
+        for count, drawing in enumerate(self.pages(events), 1):
+            with open_page(count) as page:
+                drawing.write(page)
+        return count
+
+    def save(self, events, filename):
+        """
+        Write pages to files named `filename % page_number`, e.g.
+        'song-%03d.svg'. Returns the page count.
+        """
+        return self.render(events, lambda number: open(filename % number, 'w'))
+
+
+class GuitarTablature(Tablature):
+    fretboard_cls = GuitarFretboard
+
+
+class BassTablature(Tablature):
+    fretboard_cls = BassFretboard
+
+
+class UkuleleTablature(Tablature):
+    fretboard_cls = UkuleleFretboard
@@ -0,0 +1,136 @@
+import collections
+import copy
+import os
+
+from attrdict import AttrDict
+import pkg_resources
+import yaml
+import diagram
+from .utils import dict_merge
+
+THEMES = {}
+
+Theme = collections.namedtuple('Theme', ('name', 'fretboard', 'chord'))
+Theme.__doc__ = """
+A registered theme, resolved against the fretboard and chord default
+styles and frozen so it can be shared by every diagram using it.
+"""
+
+
+class FrozenAttrDict(AttrDict):
+    """
+    Read-only AttrDict, for styles shared by every diagram. Attribute and
+    item access work as on AttrDict, while any change raises TypeError.
+    Adding a mapping returns a new, mutable AttrDict.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('%s is read-only' % type(self).__name__)
+
+    __setitem__ = __delitem__ = __setattr__ = __delattr__ = _readonly
+    clear = pop = popitem = setdefault = update = __ior__ = _readonly
+
+    def __add__(self, other):
+        return AttrDict(self) + other
+
+    def __radd__(self, other):
+        return other + AttrDict(self)
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        # every value is immutable already
+        return self
+
+
+def freeze(value):
+    """
+    Recursively convert dicts to FrozenAttrDicts and lists to tuples.
+    """
+    if isinstance(value, dict):
+        return FrozenAttrDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def validate_style(style, defaults, path='style'):
+    """
+    Check that every key of `style` is a known style option. Raises
+    ValueError naming the first offending option.
+    """
+    if not isinstance(style, dict):
+        raise ValueError('%s must be a mapping' % path)
+
+    for key, value in style.items():
+        name = '%s.%s' % (path, key)
+        if key not in defaults:
+            raise ValueError('unknown style option %s' % name)
+        if isinstance(defaults[key], dict):
+            validate_style(value, defaults[key], name)
+        elif isinstance(value, dict):
+            raise ValueError('%s must not be a mapping' % name)
+
+
+def register_theme(name, style):
+    """
+    Validate `style`, resolve it against the default styles and register it
+    as `name`, replacing any theme of the same name.
+    """
+    defaults = dict_merge(copy.deepcopy(diagram.FRETBOARD_STYLE), diagram.CHORD_STYLE)
+    validate_style(style, defaults)
+
+    colors = style.get('string', {}).get('colors')
+    if colors is not None and not isinstance(colors, (list, tuple)):
+        raise ValueError('style.string.colors must be a list of colors')
+
+    fretboard = dict_merge(copy.deepcopy(diagram.FRETBOARD_STYLE), copy.deepcopy(style))
+    chord = dict_merge(copy.deepcopy(fretboard), diagram.CHORD_STYLE)
+    # Anything the theme sets wins over the chord defaults too
+    dict_merge(chord, copy.deepcopy(style))
+
+    theme = THEMES[name] = Theme(
+        name=name,
+        fretboard=freeze(fretboard),
+        chord=freeze(chord),
+    )
+    return theme
+
+
+def load_theme(filename, name=None):
+    """
+    Register the theme in a YAML file, named after the file unless `name`
+    is given.
+    """
+    if name is None:
+        name = os.path.splitext(os.path.basename(filename))[0]
+    with open(filename) as fd:
+        return register_theme(name, yaml.safe_load(fd) or {})
+
+
+def load_builtin_themes():
+    """
+    Register the themes shipped in diagram/themes/.
+    """
+    for filename in sorted(pkg_resources.resource_listdir('diagram', 'themes')):
+        name, ext = os.path.splitext(filename)
+        if ext in ('.yml', '.yaml'):
+            style = yaml.safe_load(pkg_resources.resource_string(
+                'diagram', 'themes/' + filename))
+            register_theme(name, style or {})
+
+
+def get_theme(theme):
+    """
+    Look up a registered theme by name. Theme instances are passed through.
+    """
+    if isinstance(theme, Theme):
+        return theme
+    try:
+        return THEMES[theme]
+    except KeyError:
+        raise ValueError('unknown theme %r' % theme)